@@ -1,35 +1,21 @@
 # account_analyzer.py
 import tweepy
-from datetime import datetime
 from typing import Dict, Any
+from fetch_context import FetchContext
 
 class AccountAnalyzer:
     def __init__(self, client: tweepy.Client):
         self.client = client
 
-    def analyze_user(self, user_id: str) -> Dict[str, Any]:
+    def analyze_context(self, context: FetchContext) -> Dict[str, Any]:
         """
-        Analyze a Twitter user and return a comprehensive report
+        Analyze the author of an already fetched context without further API calls
         """
         try:
-            # Get user information
-            user = self.client.get_user(
-                id=user_id,
-                user_fields=['created_at', 'description', 'public_metrics', 'verified']
-            )
-            
-            if not user.data:
-                return {"error": "User not found"}
-
-            # Get recent tweets for analysis
-            tweets = self.client.get_users_tweets(
-                user_id,
-                max_results=100,
-                tweet_fields=['public_metrics', 'created_at']
-            )
+            user = context.author
 
             # Calculate account age
-            account_age = datetime.now() - user.data.created_at
+            account_age = context.fetched_at - user.created_at
             account_age_days = account_age.days
 
             # Calculate engagement metrics
@@ -38,34 +24,34 @@ class AccountAnalyzer:
             total_replies = 0
             tweet_count = 0
 
-            if tweets.data:
-                for tweet in tweets.data:
-                    metrics = tweet.public_metrics
-                    total_likes += metrics.get('like_count', 0)
-                    total_retweets += metrics.get('retweet_count', 0)
-                    total_replies += metrics.get('reply_count', 0)
-                    tweet_count += 1
+            for tweet in context.timeline:
+                metrics = tweet.public_metrics
+                total_likes += metrics.get('like_count', 0)
+                total_retweets += metrics.get('retweet_count', 0)
+                total_replies += metrics.get('reply_count', 0)
+                tweet_count += 1
 
             avg_likes = total_likes / tweet_count if tweet_count > 0 else 0
             avg_retweets = total_retweets / tweet_count if tweet_count > 0 else 0
             avg_replies = total_replies / tweet_count if tweet_count > 0 else 0
 
             # Calculate follower/following ratio
-            metrics = user.data.public_metrics
+            metrics = user.public_metrics
             followers_count = metrics.get('followers_count', 0)
             following_count = metrics.get('following_count', 0)
             follower_ratio = followers_count / following_count if following_count > 0 else 0
 
             # Analyze bio content
-            bio = user.data.description
+            bio = user.description or ""
             bio_length = len(bio)
             bio_has_links = 'http' in bio.lower()
             bio_has_emoji = any(ord(c) > 127 for c in bio)
 
             return {
-                "username": user.data.username,
+                "user_id": str(user.id),
+                "username": user.username,
                 "account_age_days": account_age_days,
-                "verified": user.data.verified,
+                "verified": user.verified,
                 "followers_count": followers_count,
                 "following_count": following_count,
                 "follower_ratio": round(follower_ratio, 2),
@@ -0,0 +1,148 @@
+# analysis_api.py
+import json
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Optional
+from urllib.parse import urlparse, parse_qs
+import tweepy
+from analysis_pipeline import AnalysisPipeline, BUSY_ERROR
+from rate_limits import reset_seconds
+
+MAX_BATCH_SIZE = 100
+HANDLE_PATTERN = re.compile(r"^@?[A-Za-z0-9_]{1,15}$")
+
+
+class AnalysisRequestHandler(BaseHTTPRequestHandler):
+    """
+    GET  /analyze/{handle}[?format=text]  -> one report
+    POST /analyze {"handles": [...]}      -> reports keyed by handle
+    GET  /health                          -> liveness check
+    """
+    protocol_version = "HTTP/1.1"  # Keep-alive for dashboards polling many accounts
+
+    def log_message(self, format: str, *args) -> None:
+        # The bot's own timing logs are enough; skip per-request access logs
+        pass
+
+    def _send(self, status: int, body: str, content_type: str,
+              headers: Optional[Dict[str, str]] = None) -> None:
+        payload = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _send_json(self, status: int, data: Dict[str, Any],
+                   headers: Optional[Dict[str, str]] = None) -> None:
+        self._send(status, json.dumps(data, default=str), "application/json", headers)
+
+    def _status_for(self, analysis: Dict[str, Any]) -> int:
+        if "error" not in analysis:
+            return 200
+        if analysis["error"] == "User not found":
+            return 404
+        return 503 if analysis["error"] == BUSY_ERROR else 502
+
+    def _discard_body(self) -> None:
+        """Consume an unread request body so the next request on this connection parses cleanly"""
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            self.close_connection = True
+            return
+        while length > 0:
+            chunk = self.rfile.read(min(length, 65536))
+            if not chunk:
+                break
+            length -= len(chunk)
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        if url.path == "/health":
+            self._send_json(200, {"status": "ok"})
+            return
+
+        parts = url.path.strip("/").split("/")
+        if len(parts) != 2 or parts[0] != "analyze" or not HANDLE_PATTERN.match(parts[1]):
+            self._send_json(404, {"error": "Use GET /analyze/{handle}"})
+            return
+
+        try:
+            analysis = self.server.pipeline.analyze_handle(parts[1])
+        except tweepy.errors.TooManyRequests as e:
+            wait = int(reset_seconds(e))
+            self._send_json(429, {"error": "Upstream rate limit reached"}, {"Retry-After": str(wait)})
+            return
+        except Exception as e:
+            print(f"Error serving analysis for {parts[1]}: {e}")
+            self._send_json(502, {"error": str(e)})
+            return
+
+        status = self._status_for(analysis)
+        headers = {"Retry-After": "5"} if status == 503 else None
+        if parse_qs(url.query).get("format") == ["text"]:
+            self._send(status, analysis.get("report") or analysis.get("error", ""),
+                       "text/plain; charset=utf-8", headers)
+        else:
+            self._send_json(status, analysis, headers)
+
+    def do_POST(self) -> None:
+        if urlparse(self.path).path != "/analyze":
+            self._discard_body()
+            self._send_json(404, {"error": "Use POST /analyze"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+            handles = body["handles"]
+        except (ValueError, KeyError, TypeError):
+            self._send_json(400, {"error": 'Body must be JSON like {"handles": ["name", ...]}'})
+            return
+
+        if not isinstance(handles, list) or len(handles) > MAX_BATCH_SIZE:
+            self._send_json(400, {"error": f"handles must be a list of at most {MAX_BATCH_SIZE}"})
+            return
+        invalid = [h for h in handles if not isinstance(h, str) or not HANDLE_PATTERN.match(h)]
+        if invalid:
+            self._send_json(400, {"error": "Invalid handles", "handles": invalid})
+            return
+
+        def analyze(handle):
+            try:
+                return self.server.pipeline.analyze_handle(handle)
+            except Exception as e:
+                return {"error": str(e)}
+
+        results = dict(zip(handles, self.server.executor.map(analyze, handles)))
+        if body.get("format") == "text":
+            results = {h: a.get("report") or a.get("error") for h, a in results.items()}
+        self._send_json(200, {"results": results})
+
+
+class AnalysisServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, pipeline: AnalysisPipeline, batch_workers: int = 8):
+        super().__init__(address, AnalysisRequestHandler)
+        self.pipeline = pipeline
+        # Shared across batch requests; upstream concurrency is still capped by the pipeline
+        self.executor = ThreadPoolExecutor(max_workers=batch_workers, thread_name_prefix="analysis-batch")
+
+    def start(self) -> threading.Thread:
+        """Serve in a background daemon thread"""
+        thread = threading.Thread(target=self.serve_forever, name="analysis-api", daemon=True)
+        thread.start()
+        host, port = self.server_address[:2]
+        print(f"Analysis API listening on http://{host}:{port}")
+        return thread
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+        self.executor.shutdown(wait=False)
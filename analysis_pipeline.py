@@ -0,0 +1,219 @@
+# analysis_pipeline.py
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Any, Optional
+from fetch_context import ContextFetcher, FetchContext
+from account_analyzer import AccountAnalyzer
+from trust_verifier import TrustVerifier
+from report_generator import ReportGenerator
+from follower_series import FollowerSampler
+from trust_scorer import TrustScorer
+from history_store import HistoryStore
+from memory_budget import estimate_size
+
+CACHE_SLOT_BYTES = 240  # Ordered dict slot, entry tuple, key and handle map entry around each analysis
+BUSY_ERROR = "Analysis capacity busy, try again later"
+
+
+class AnalysisPipeline:
+    """
+    Fetch, analyze, vouch-check and render one account, shared by the reply loop and the API
+    Results are cached per user id, concurrent requests for the same account share one
+    upstream fetch, and at most max_inflight fetches hit the API at once. reply_slots of
+    those are reserved for the reply loop; API lookups share the rest and are refused with
+    BUSY_ERROR when none frees up within api_wait seconds. API vouch scans also leave
+    vouch_reserve follower calls of the rate window to replies. Cached analyses are shared
+    between callers and must be treated as read-only.
+    """
+
+    def __init__(self, fetcher: ContextFetcher, analyzer: AccountAnalyzer, verifier: TrustVerifier,
+                 report_generator: ReportGenerator, cache_ttl: int = 900, max_inflight: int = 4,
+                 sampler: Optional[FollowerSampler] = None, scorer: Optional[TrustScorer] = None,
+                 history: Optional[HistoryStore] = None, reply_slots: int = 1, api_wait: float = 30,
+                 vouch_reserve: int = 9):
+        self.fetcher = fetcher
+        self.analyzer = analyzer
+        self.verifier = verifier
+        self.report_generator = report_generator
+        self.sampler = sampler
+        self.scorer = scorer or report_generator.scorer
+        self.history = history  # Records analyses computed for the API; replies record their own
+        self.cache_ttl = cache_ttl
+        self.api_wait = api_wait
+        self.vouch_reserve = vouch_reserve  # Follower calls per window only replies may spend
+        self._cache = OrderedDict()  # user_id -> (expires_at, analysis, nbytes), oldest first
+        self._cache_bytes = 0  # Sum of nbytes, measured once per entry when it is stored
+        self._handles = {}  # lowercase handle -> user_id
+        self._lock = threading.Lock()
+        self._inflight = {}  # key -> {"done": Event, "result": analysis, "reply": bool} for the running fetch
+        self._reply_upstream = threading.BoundedSemaphore(reply_slots)
+        self._api_upstream = threading.BoundedSemaphore(max(1, max_inflight - reply_slots))
+
+    def _cached(self, user_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        if user_id is None:
+            return None
+        with self._lock:
+            entry = self._cache.get(str(user_id))
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                self._drop(str(user_id))
+                return None
+            self._cache.move_to_end(str(user_id))
+            return entry[1]
+
+    def _store(self, analysis: Dict[str, Any], reply: bool = False) -> None:
+        # A failed vouch check would otherwise be served as the verdict until the TTL runs out
+        if "error" in analysis or analysis.get("vouch_error"):
+            return
+        # An API scan may stop early to spare the reserve; a reply should get its own full scan
+        if not reply and analysis.get("vouch_partial"):
+            return
+        nbytes = estimate_size(analysis) + CACHE_SLOT_BYTES
+        with self._lock:
+            self._drop(analysis["user_id"])
+            self._cache[analysis["user_id"]] = (time.monotonic() + self.cache_ttl, analysis, nbytes)
+            self._cache_bytes += nbytes
+            self._handles[analysis["username"].lower()] = analysis["user_id"]
+
+    def _drop(self, user_id: str) -> int:
+        """Remove a cached analysis and its handle mapping; caller holds the lock. Returns bytes freed"""
+        entry = self._cache.pop(user_id, None)
+        if entry is None:
+            return 0
+        handle = entry[1]["username"].lower()
+        if self._handles.get(handle) == user_id:
+            del self._handles[handle]
+        self._cache_bytes -= entry[2]
+        return entry[2]
+
+    def _single_flight(self, key: str, compute: Callable[[], Dict[str, Any]],
+                       reply: bool = False) -> Dict[str, Any]:
+        """
+        Run compute once per key; concurrent callers wait for and share the leader's result
+        The reply loop waits for its reserved slot; API callers give up after api_wait seconds.
+        """
+        while True:
+            with self._lock:
+                flight = self._inflight.get(key)
+                leader = flight is None
+                if leader:
+                    flight = self._inflight[key] = {"done": threading.Event(), "result": None, "reply": reply}
+
+            if not leader:
+                flight["done"].wait()
+                result = flight["result"] or {"error": "Analysis failed"}
+                if reply and not flight["reply"] and (
+                        result.get("error") == BUSY_ERROR or result.get("vouch_partial")):
+                    # An API leader was refused or spared the reserve; the reply loop has its own
+                    # slot and quota, so go again
+                    continue
+                return result
+
+            try:
+                if reply:
+                    with self._reply_upstream:
+                        flight["result"] = compute()
+                elif self._api_upstream.acquire(timeout=self.api_wait):
+                    try:
+                        flight["result"] = compute()
+                    finally:
+                        self._api_upstream.release()
+                else:
+                    flight["result"] = {"error": BUSY_ERROR}
+                self._store(flight["result"], reply)
+            finally:
+                with self._lock:
+                    del self._inflight[key]
+                flight["done"].set()
+            return flight["result"]
+
+    def analyze_context(self, context: FetchContext, reply: bool = False) -> Dict[str, Any]:
+        """
+        Analyze, vouch-check, score and render an already fetched snapshot
+        Only the reply loop (reply=True) may spend the follower calls held in vouch_reserve.
+        """
+        analysis = self.analyzer.analyze_context(context)
+        if "error" in analysis:
+            return analysis
+
+        vouched = self.verifier.is_vouched(context.author_id, reserve=0 if reply else self.vouch_reserve)
+        analysis["vouched"] = vouched["vouched"]
+        analysis["vouch_count"] = vouched["vouch_count"]
+        analysis["trusted_followers"] = vouched["trusted_followers"]
+        analysis["vouch_partial"] = vouched["partial"]
+        analysis["vouch_error"] = vouched["error"]
+
+        if self.sampler:
+            # The counts were just fetched, so they double as a free time-series sample
+            self.sampler.observe(analysis["user_id"], analysis["followers_count"], analysis["following_count"])
+            analysis.update(self.sampler.stats(analysis["user_id"]))
+
+        # Score once here; rendering only reads the result
+        result = self.scorer.score(analysis)
+        analysis["trust_score"] = result["score"]
+        analysis["score_breakdown"] = result["rules"]
+        analysis["report"] = self.report_generator._format_report(analysis)
+        return analysis
+
+    def analyze_tweet(self, tweet_id: str) -> Dict[str, Any]:
+        """
+        Analyze the author of a tweet for the reply loop; the timeline is only fetched on a cache miss
+        """
+        original = self.fetcher.fetch_original(tweet_id)
+        if original is None:
+            return {"error": "Original tweet not found"}
+        tweet, author = original
+
+        cached = self._cached(author.id)
+        if cached is not None:
+            return cached
+        return self._single_flight(
+            str(author.id),
+            lambda: self.analyze_context(self.fetcher.build(author, original_tweet=tweet), reply=True),
+            reply=True
+        )
+
+    def analyze_handle(self, handle: str) -> Dict[str, Any]:
+        """
+        Analyze an account by handle for the API, answering from cache without any API call when possible
+        The handle is resolved to a user id first, so a reply for the same account shares the fetch.
+        """
+        handle = handle.lstrip("@")
+        with self._lock:
+            user_id = self._handles.get(handle.lower())
+        cached = self._cached(user_id)
+        if cached is not None:
+            return cached
+
+        author = self.fetcher.fetch_user(handle)
+        if author is None:
+            return {"error": "User not found"}
+        cached = self._cached(author.id)
+        if cached is not None:
+            return cached
+
+        def compute():
+            analysis = self.analyze_context(self.fetcher.build(author))
+            if self.history and "error" not in analysis:
+                self.history.record(analysis, analysis["report"])
+            return analysis
+
+        return self._single_flight(str(author.id), compute)
+
+    def memory_size(self) -> int:
+        """Bytes held by cached analyses, as measured when each was stored"""
+        return self._cache_bytes
+
+    def evict(self, nbytes: int) -> int:
+        """Drop expired analyses, then the least recently used, until roughly nbytes are freed"""
+        freed = 0
+        now = time.monotonic()
+        with self._lock:
+            for user_id in [u for u, entry in self._cache.items() if entry[0] < now]:
+                freed += self._drop(user_id)
+            while self._cache and freed < nbytes:
+                freed += self._drop(next(iter(self._cache)))
+            self._cache = OrderedDict(self._cache)
+        return freed
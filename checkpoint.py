@@ -0,0 +1,41 @@
+# checkpoint.py
+import json
+import os
+import tempfile
+from typing import Dict, Any
+
+
+class Checkpointer:
+    def __init__(self, path: str = "rugguard_checkpoint.json"):
+        self.path = path
+
+    def save(self, state: Dict[str, Any]) -> None:
+        """
+        Atomically replace the checkpoint: write a temp file, fsync, then rename over it
+        A crash at any point leaves either the old or the new checkpoint, never a partial one.
+        """
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(prefix=".checkpoint-", dir=directory)
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(state, f, default=str)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def load(self) -> Dict[str, Any]:
+        """
+        Return the last checkpoint, or an empty dict if there is none or it is unreadable
+        """
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable checkpoint {self.path}: {e}")
+            return {}
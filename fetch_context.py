@@ -0,0 +1,96 @@
+# fetch_context.py
+import tweepy
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional, Tuple, Any
+
+# Fields requested once per trigger and shared by every component
+USER_FIELDS = [
+    "created_at",
+    "description",
+    "entities",
+    "location",
+    "name",
+    "pinned_tweet_id",
+    "profile_image_url",
+    "protected",
+    "public_metrics",
+    "url",
+    "username",
+    "verified"
+]
+
+TWEET_FIELDS = [
+    "author_id",
+    "created_at",
+    "conversation_id",
+    "public_metrics",
+    "entities",
+    "in_reply_to_user_id",
+    "referenced_tweets",
+    "lang"
+]
+
+
+@dataclass(frozen=True)
+class FetchContext:
+    """
+    Immutable snapshot of everything fetched for one trigger
+    """
+    author: Any
+    timeline: Tuple[Any, ...]
+    original_tweet: Optional[Any] = None
+    fetched_at: Optional[datetime] = None
+
+    @property
+    def author_id(self) -> str:
+        return self.author.id
+
+
+class ContextFetcher:
+    def __init__(self, client: tweepy.Client):
+        self.client = client
+
+    def fetch_original(self, tweet_id: str) -> Optional[Tuple[Any, Any]]:
+        """
+        Fetch a tweet and its author in one call, without the timeline
+        Returns (tweet, author), or None if the tweet cannot be found
+        """
+        # The author comes back in the includes, so no separate user lookup is needed
+        original = self.client.get_tweet(
+            tweet_id,
+            tweet_fields=TWEET_FIELDS,
+            expansions=["author_id"],
+            user_fields=USER_FIELDS
+        )
+        if not original.data:
+            return None
+
+        users = original.includes.get("users", []) if original.includes else []
+        author = next((u for u in users if u.id == original.data.author_id), None)
+        if author is None:
+            return None
+        return original.data, author
+
+    def fetch_user(self, username: str) -> Optional[Any]:
+        """
+        Fetch a user by handle, without the timeline; None if there is no such account
+        """
+        user = self.client.get_user(username=username.lstrip("@"), user_fields=USER_FIELDS)
+        return user.data or None
+
+    def build(self, author: Any, original_tweet: Any = None) -> FetchContext:
+        """
+        Fetch the author's timeline and freeze everything into one snapshot
+        """
+        tweets = self.client.get_users_tweets(
+            author.id,
+            max_results=100,
+            tweet_fields=TWEET_FIELDS
+        )
+        return FetchContext(
+            author=author,
+            timeline=tuple(tweets.data or ()),
+            original_tweet=original_tweet,
+            fetched_at=datetime.now(timezone.utc)
+        )
@@ -0,0 +1,268 @@
+# follower_series.py
+import os
+import tempfile
+import threading
+import time
+import numpy as np
+import tweepy
+from typing import List, Dict, Any, Optional
+from rate_limits import reset_seconds
+
+# Columns of each ring buffer row
+TIMESTAMP, FOLLOWERS, FOLLOWING = 0, 1, 2
+SAMPLE_COLUMNS = 3
+USERS_PER_LOOKUP = 100  # get_users accepts up to 100 ids per call
+
+
+class FollowerSampler:
+    """
+    Follower/following time series for watched and recently analyzed accounts
+    All series live in one preallocated (accounts x capacity x 3) array, so memory per
+    account is fixed. When every slot is taken, the least recently analyzed unwatched
+    account gives up its slot. A background thread samples due accounts in batches of
+    100 ids, spending at most calls_per_window lookups per window.
+    """
+
+    def __init__(self, client: tweepy.Client, path: str = "rugguard_followers.npz",
+                 max_accounts: int = 2000, capacity: int = 168, sample_interval: int = 3600,
+                 calls_per_window: int = 10, window_seconds: int = 900, min_burst_gain: int = 500):
+        self.client = client
+        self.path = path
+        self.max_accounts = max_accounts
+        self.capacity = capacity
+        self.sample_interval = sample_interval  # Seconds between samples of one account
+        self.calls_per_window = calls_per_window
+        self.window_seconds = window_seconds
+        self.min_burst_gain = min_burst_gain  # Smaller jumps are noise, not bought followers
+        self.stop_event = threading.Event()
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()  # Held across a whole save, after _lock is released
+
+        # uint32 holds epoch seconds and follower counts at half the size of int64
+        self._samples = np.zeros((max_accounts, capacity, SAMPLE_COLUMNS), dtype=np.uint32)
+        self._heads = np.zeros(max_accounts, dtype=np.int64)  # Next write position per slot
+        self._counts = np.zeros(max_accounts, dtype=np.int64)
+        self._last_sampled = np.zeros(max_accounts, dtype=np.float64)
+        self._last_used = np.zeros(max_accounts, dtype=np.float64)
+        self._pinned = np.zeros(max_accounts, dtype=bool)
+        self._user_ids = np.zeros(max_accounts, dtype=np.int64)  # 0 marks a free slot
+        self._slots = {}  # user_id -> slot
+        self._thread = None
+
+    def _slot_for(self, user_id: int) -> Optional[int]:
+        """Slot holding user_id, claiming one if needed; None when every slot is pinned"""
+        slot = self._slots.get(user_id)
+        if slot is not None:
+            return slot
+
+        free = np.flatnonzero(self._user_ids == 0)
+        if free.size:
+            slot = int(free[0])
+        else:
+            candidates = np.where(self._pinned, np.inf, self._last_used)
+            slot = int(np.argmin(candidates))
+            if np.isinf(candidates[slot]):
+                return None
+            del self._slots[int(self._user_ids[slot])]
+
+        self._user_ids[slot] = user_id
+        self._heads[slot] = 0
+        self._counts[slot] = 0
+        self._last_sampled[slot] = 0
+        self._pinned[slot] = False
+        self._slots[user_id] = slot
+        return slot
+
+    def _append(self, slot: int, timestamp: int, followers: int, following: int) -> None:
+        self._samples[slot, self._heads[slot]] = (timestamp, followers, following)
+        self._heads[slot] = (self._heads[slot] + 1) % self.capacity
+        self._counts[slot] = min(self._counts[slot] + 1, self.capacity)
+        self._last_sampled[slot] = timestamp
+
+    def watch(self, user_ids: List[str]) -> None:
+        """Pin accounts so they are always sampled and never lose their slot"""
+        with self._lock:
+            for user_id in user_ids:
+                slot = self._slot_for(int(user_id))
+                if slot is None:
+                    print(f"No follower series slot left to watch {user_id}; raise max_accounts")
+                    continue
+                self._pinned[slot] = True
+
+    def observe(self, user_id: str, followers: int, following: int) -> None:
+        """
+        Record a sample taken from an analysis that already fetched the metrics
+        The account is then kept sampled in the background while its slot lasts.
+        Skipped when every slot is pinned by a watched account.
+        """
+        now = time.time()
+        with self._lock:
+            slot = self._slot_for(int(user_id))
+            if slot is None:
+                return
+            self._last_used[slot] = now
+            if now - self._last_sampled[slot] >= self.sample_interval / 2:
+                self._append(slot, int(now), followers, following)
+
+    def series(self, user_id: str) -> np.ndarray:
+        """Samples for an account in time order, as a (n x 3) copy"""
+        with self._lock:
+            slot = self._slots.get(int(user_id))
+            if slot is None:
+                return np.empty((0, SAMPLE_COLUMNS), dtype=np.uint32)
+            count, head = self._counts[slot], self._heads[slot]
+            order = (np.arange(head - count, head)) % self.capacity
+            return self._samples[slot, order].copy()
+
+    def stats(self, user_id: str) -> Dict[str, Any]:
+        """
+        Growth rate and largest single-interval follower jump for the report
+        """
+        rows = self.series(user_id)
+        result = {
+            "follower_samples": len(rows),
+            "follower_growth_per_day": 0.0,
+            "follower_burst_pct": 0.0
+        }
+        if len(rows) < 2:
+            return result
+
+        timestamps = rows[:, TIMESTAMP].astype(np.float64)
+        followers = rows[:, FOLLOWERS].astype(np.float64)
+        span_days = (timestamps[-1] - timestamps[0]) / 86400
+        if span_days > 0:
+            result["follower_growth_per_day"] = round(float(followers[-1] - followers[0]) / span_days, 1)
+
+        gains = np.diff(followers)
+        jumps = gains / np.maximum(followers[:-1], 1) * 100
+        significant = gains >= self.min_burst_gain
+        if significant.any():
+            result["follower_burst_pct"] = round(float(jumps[significant].max()), 1)
+        return result
+
+    def _due_user_ids(self, limit: int) -> List[int]:
+        """Accounts whose last sample is older than the interval, stalest first"""
+        now = time.time()
+        with self._lock:
+            due = np.flatnonzero((self._user_ids != 0) & (now - self._last_sampled >= self.sample_interval))
+            due = due[np.argsort(self._last_sampled[due])][:limit]
+            return [int(u) for u in self._user_ids[due]]
+
+    def sample_once(self) -> int:
+        """
+        Spend at most one window's budget sampling due accounts; returns accounts sampled
+        """
+        user_ids = self._due_user_ids(self.calls_per_window * USERS_PER_LOOKUP)
+        sampled = 0
+        for start in range(0, len(user_ids), USERS_PER_LOOKUP):
+            if self.stop_event.is_set():
+                break
+            batch = user_ids[start:start + USERS_PER_LOOKUP]
+            try:
+                users = self.client.get_users(ids=batch, user_fields=["public_metrics"])
+            except tweepy.errors.TooManyRequests as e:
+                print(f"Rate limit hit while sampling follower counts, resuming in "
+                      f"{int(reset_seconds(e, self.window_seconds))} seconds")
+                break
+            except Exception as e:
+                print(f"Error sampling follower counts: {e}")
+                continue
+
+            now = int(time.time())
+            with self._lock:
+                for user in users.data or []:
+                    slot = self._slots.get(int(user.id))
+                    if slot is None:
+                        continue
+                    metrics = user.public_metrics
+                    self._append(slot, now, metrics.get("followers_count", 0), metrics.get("following_count", 0))
+                    sampled += 1
+        return sampled
+
+    def run(self) -> None:
+        while not self.stop_event.is_set():
+            self.sample_once()
+            self.save()
+            self.stop_event.wait(self.window_seconds)
+
+    def start(self) -> threading.Thread:
+        """Sample in a background daemon thread"""
+        self._thread = threading.Thread(target=self.run, name="follower-sampler", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self, timeout: float = 5) -> None:
+        """Stop sampling and save; a lookup still in flight is not waited on past timeout"""
+        self.stop_event.set()
+        if self._thread:
+            self._thread.join(timeout)
+        self.save()
+
+    def memory_size(self) -> int:
+        """Fixed bytes held by the preallocated buffers"""
+        return (self._samples.nbytes + self._heads.nbytes + self._counts.nbytes + self._last_sampled.nbytes
+                + self._last_used.nbytes + self._pinned.nbytes + self._user_ids.nbytes
+                + len(self._slots) * 120)
+
+    def save(self) -> None:
+        """
+        Write occupied slots only, unrolled into time order, to a compressed .npz file
+        Saves are serialized and each writes its own temp file, so the sampler thread and
+        stop() can both save without clobbering each other.
+        """
+        with self._save_lock:
+            with self._lock:
+                slots = np.flatnonzero(self._user_ids != 0)
+                counts = self._counts[slots]
+                order = (self._heads[slots, None] - counts[:, None] + np.arange(self.capacity)) % self.capacity
+                samples = np.take_along_axis(self._samples[slots], order[:, :, None], axis=1)
+                arrays = {
+                    "user_ids": self._user_ids[slots],
+                    "counts": counts,
+                    "pinned": self._pinned[slots],
+                    "last_used": self._last_used[slots],
+                    "samples": samples
+                }
+
+            directory = os.path.dirname(os.path.abspath(self.path))
+            try:
+                fd, tmp_path = tempfile.mkstemp(prefix=".followers-", suffix=".npz", dir=directory)
+            except OSError as e:
+                print(f"Error saving follower series: {e}")
+                return
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    np.savez_compressed(f, **arrays)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                print(f"Error saving follower series: {e}")
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+    def load(self) -> None:
+        """Restore series saved by save(); a missing file just means a fresh start"""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with np.load(self.path) as data:
+                user_ids, counts = data["user_ids"], data["counts"]
+                pinned, last_used, samples = data["pinned"], data["last_used"], data["samples"]
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Ignoring unreadable follower series {self.path}: {e}")
+            return
+
+        with self._lock:
+            for i in range(min(len(user_ids), self.max_accounts)):
+                slot = self._slot_for(int(user_ids[i]))
+                if slot is None:
+                    break
+                count = min(int(counts[i]), self.capacity)
+                # Saved rows are in time order with the oldest sample first
+                rows = samples[i, int(counts[i]) - count:int(counts[i])]
+                self._samples[slot, :count] = rows
+                self._heads[slot] = count % self.capacity
+                self._counts[slot] = count
+                self._last_sampled[slot] = rows[-1, TIMESTAMP] if count else 0
+                self._last_used[slot] = last_used[i]
+                self._pinned[slot] = pinned[i]
+        print(f"Loaded follower series for {len(self._slots)} accounts")
@@ -0,0 +1,196 @@
+# history_store.py
+import argparse
+import json
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Optional
+from memory_budget import estimate_size
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT,
+    handle TEXT COLLATE NOCASE,
+    created_at TEXT NOT NULL,
+    trigger_tweet_id TEXT,
+    trust_score REAL,
+    vouched INTEGER,
+    analysis TEXT,
+    report TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_reports_user_time ON reports (user_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_reports_handle_time ON reports (handle, created_at);
+CREATE INDEX IF NOT EXISTS idx_reports_time ON reports (created_at);
+"""
+
+INSERT = """
+INSERT INTO reports (user_id, handle, created_at, trigger_tweet_id, trust_score, vouched, analysis, report)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+class HistoryStore:
+    def __init__(self, path: str = "rugguard_history.db", batch_size: int = 50, flush_interval: float = 5.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending = queue.Queue()
+        self._stopped = threading.Event()
+
+        # Readers get their own connection; the writer thread owns another
+        self._read_conn = self._connect()
+        self._read_conn.executescript(SCHEMA)
+        self._read_lock = threading.Lock()
+
+        self._writer = threading.Thread(target=self._write_loop, name="history-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def record(self, analysis: Dict[str, Any], report: Optional[str] = None,
+               trigger_tweet_id: Optional[str] = None) -> None:
+        """
+        Queue an analysis and its report for writing; never blocks on disk
+        """
+        row = (
+            analysis.get("user_id"),
+            analysis.get("username"),
+            datetime.now(timezone.utc).isoformat(),
+            str(trigger_tweet_id) if trigger_tweet_id is not None else None,
+            analysis.get("trust_score"),
+            int(bool(analysis.get("vouched", False))),
+            json.dumps({k: v for k, v in analysis.items() if k != "report"}, default=str),
+            report
+        )
+        self._pending.put(row)
+
+    def _write_loop(self) -> None:
+        conn = self._connect()
+        while not (self._stopped.is_set() and self._pending.empty()):
+            batch = []
+            try:
+                timeout = 0.1 if self._stopped.is_set() else self.flush_interval
+                batch.append(self._pending.get(timeout=timeout))
+            except queue.Empty:
+                continue
+
+            # Gather whatever else is waiting, up to one batch
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._pending.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                with conn:
+                    conn.executemany(INSERT, batch)
+            except sqlite3.Error as e:
+                print(f"Error writing report history: {e}")
+        conn.close()
+
+    def pending_count(self) -> int:
+        return self._pending.qsize()
+
+    def memory_size(self) -> int:
+        """Estimated bytes held by rows waiting for the writer"""
+        with self._pending.mutex:
+            rows = list(self._pending.queue)
+        return estimate_size(rows)
+
+    def close(self) -> None:
+        """
+        Flush queued rows and stop the writer thread
+        """
+        self._stopped.set()
+        self._writer.join()
+        self._read_conn.close()
+
+    def history(self, user_id: Optional[str] = None, handle: Optional[str] = None,
+                since: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        Return the most recent reports for an account, newest first
+        """
+        if user_id is None and handle is None:
+            raise ValueError("Either user_id or handle is required")
+
+        if user_id is not None:
+            query = "SELECT * FROM reports WHERE user_id = ?"
+            params = [str(user_id)]
+        else:
+            query = "SELECT * FROM reports WHERE handle = ?"
+            params = [handle.lstrip("@")]
+
+        if since is not None:
+            query += " AND created_at >= ?"
+            params.append(since)
+        query += " ORDER BY created_at DESC LIMIT ?"
+        params.append(limit)
+
+        with self._read_lock:
+            rows = self._read_conn.execute(query, params).fetchall()
+
+        results = []
+        for row in rows:
+            entry = dict(row)
+            entry["analysis"] = json.loads(entry["analysis"]) if entry["analysis"] else {}
+            entry["vouched"] = bool(entry["vouched"])
+            results.append(entry)
+        return results
+
+    def score_trend(self, user_id: Optional[str] = None, handle: Optional[str] = None,
+                    limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        Return (created_at, trust_score) pairs for an account, oldest first
+        """
+        rows = self.history(user_id=user_id, handle=handle, limit=limit)
+        return [{"created_at": r["created_at"], "trust_score": r["trust_score"]} for r in reversed(rows)]
+
+    def seen_before(self, user_id: Optional[str] = None, handle: Optional[str] = None) -> bool:
+        return bool(self.history(user_id=user_id, handle=handle, limit=1))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the RUGGUARD report history")
+    parser.add_argument("account", help="@handle, or a numeric user id with --id")
+    parser.add_argument("--id", action="store_true",
+                        help="Treat account as a user id; handles may be all digits too")
+    parser.add_argument("--db", default="rugguard_history.db", help="Path to the history database")
+    parser.add_argument("--since", help="Only reports at or after this ISO timestamp")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--json", action="store_true", help="Print raw JSON rows")
+    args = parser.parse_args()
+
+    store = HistoryStore(args.db)
+    started = time.perf_counter()
+    if args.id:
+        rows = store.history(user_id=args.account, since=args.since, limit=args.limit)
+    else:
+        rows = store.history(handle=args.account, since=args.since, limit=args.limit)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    store.close()
+
+    if args.json:
+        print(json.dumps(rows, indent=2, default=str))
+        return
+
+    if not rows:
+        print(f"No reports found for {args.account}")
+        return
+
+    print(f"{len(rows)} report(s) for {args.account} ({elapsed_ms:.1f} ms)")
+    for row in rows:
+        score = f"{row['trust_score']:.0f}" if row["trust_score"] is not None else "-"
+        vouched = "vouched" if row["vouched"] else "not vouched"
+        print(f"- {row['created_at']}  @{row['handle']}  score {score}  {vouched}")
+
+
+if __name__ == "__main__":
+    main()
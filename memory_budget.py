@@ -0,0 +1,185 @@
+# memory_budget.py
+import os
+import sys
+import threading
+import tracemalloc
+from collections import deque
+from typing import Callable, Dict, Any, Optional
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def estimate_size(obj: Any, _seen: Optional[set] = None) -> int:
+    """
+    Approximate deep size of an object in bytes, following containers and __dict__
+    """
+    if _seen is None:
+        _seen = set()
+    if id(obj) in _seen:
+        return 0
+    _seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    # Iterate over copies so a container another thread is changing does not raise
+    if isinstance(obj, dict):
+        for key, value in list(obj.items()):
+            size += estimate_size(key, _seen) + estimate_size(value, _seen)
+    elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+        for item in list(obj):
+            size += estimate_size(item, _seen)
+    elif hasattr(obj, "__dict__"):
+        size += estimate_size(vars(obj), _seen)
+    return size
+
+
+def current_rss() -> int:
+    """
+    Resident set size of this process in bytes, or 0 if it cannot be read
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+        usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is bytes on macOS and kilobytes elsewhere
+        return usage if sys.platform == "darwin" else usage * 1024
+    except (ImportError, OSError):
+        return 0
+
+
+class MemoryBudget:
+    def __init__(self, limit_bytes: int):
+        self.limit_bytes = limit_bytes
+        self._consumers = {}
+        self._lock = threading.Lock()
+        self._baseline = None
+        # Set from signal handlers; the reporter thread does the actual work
+        self._report_requested = threading.Event()
+        self._stop_tracing_requested = threading.Event()
+
+    def register(self, name: str, estimator: Callable[[], int],
+                 evict: Optional[Callable[[int], int]] = None) -> None:
+        """
+        Register a cache or queue against the budget
+        estimator returns its current size in bytes; evict(n) frees roughly n bytes
+        and returns how many it freed. Consumers without evict are counted but never trimmed.
+        """
+        with self._lock:
+            self._consumers[name] = (estimator, evict)
+
+    def unregister(self, name: str) -> None:
+        with self._lock:
+            self._consumers.pop(name, None)
+
+    def usage(self) -> Dict[str, int]:
+        with self._lock:
+            consumers = list(self._consumers.items())
+        usage = {}
+        for name, (estimator, _) in consumers:
+            try:
+                usage[name] = int(estimator())
+            except Exception as e:
+                print(f"Error estimating memory for {name}: {e}")
+                usage[name] = 0
+        return usage
+
+    def enforce(self) -> int:
+        """
+        Evict from the largest evictable consumers until usage fits the budget
+        Returns the number of bytes freed
+        """
+        usage = self.usage()
+        over = sum(usage.values()) - self.limit_bytes
+        if over <= 0:
+            return 0
+
+        with self._lock:
+            consumers = dict(self._consumers)
+
+        freed = 0
+        for name in sorted(usage, key=usage.get, reverse=True):
+            evict = consumers.get(name, (None, None))[1]
+            if evict is None:
+                continue
+            try:
+                freed += evict(over - freed)
+            except Exception as e:
+                print(f"Error evicting from {name}: {e}")
+            if freed >= over:
+                break
+
+        print(f"Memory budget exceeded by {over:,} bytes, evicted {freed:,} bytes")
+        return freed
+
+    def report(self, limit: int = 10) -> str:
+        """
+        Describe tracked usage, RSS and, once tracing is on, the top allocators
+        The first call starts tracemalloc; later calls compare against that baseline
+        until stop_tracing() turns it off again.
+        """
+        usage = self.usage()
+        lines = [
+            f"Memory budget: {sum(usage.values()):,} / {self.limit_bytes:,} bytes",
+            f"Process RSS: {current_rss():,} bytes"
+        ]
+        for name in sorted(usage, key=usage.get, reverse=True):
+            lines.append(f"- {name}: {usage[name]:,} bytes")
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(10)
+            self._baseline = tracemalloc.take_snapshot()
+            lines.append("tracemalloc started; request another report to see top allocators")
+            return "\n".join(lines)
+
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>")
+        ])
+        if self._baseline is not None:
+            stats = snapshot.compare_to(self._baseline, "lineno")[:limit]
+            lines.append(f"Top {limit} allocation changes since tracing started:")
+        else:
+            stats = snapshot.statistics("lineno")[:limit]
+            lines.append(f"Top {limit} allocators:")
+        for stat in stats:
+            lines.append(f"  {stat}")
+        return "\n".join(lines)
+
+    def stop_tracing(self) -> None:
+        """Turn tracemalloc off and drop its baseline so a long run stops paying for it"""
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._baseline = None
+
+    def request_report(self) -> None:
+        """Ask the reporter thread for a report; only sets a flag, so it is signal-safe"""
+        self._report_requested.set()
+
+    def request_stop_tracing(self) -> None:
+        """Ask the reporter thread to stop tracemalloc; only sets a flag, so it is signal-safe"""
+        self._stop_tracing_requested.set()
+        self._report_requested.set()
+
+    def run_reporter(self, stop_event: threading.Event) -> None:
+        """
+        Produce requested reports outside signal context, where taking locks is safe
+        """
+        while not stop_event.is_set():
+            if not self._report_requested.wait(1):
+                continue
+            self._report_requested.clear()
+            if self._stop_tracing_requested.is_set():
+                self._stop_tracing_requested.clear()
+                self.stop_tracing()
+                print("tracemalloc stopped")
+                continue
+            print(f"\nMemory report\n{self.report()}\n")
+
+    def start_reporter(self, stop_event: threading.Event) -> threading.Thread:
+        thread = threading.Thread(target=self.run_reporter, args=(stop_event,),
+                                  name="memory-reporter", daemon=True)
+        thread.start()
+        return thread
@@ -0,0 +1,205 @@
+# memory_soak.py
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import time
+from itertools import count
+import tweepy
+from account_analyzer import AccountAnalyzer
+from analysis_pipeline import AnalysisPipeline
+from checkpoint import Checkpointer
+from fetch_context import ContextFetcher
+from follower_series import FollowerSampler
+from history_store import HistoryStore
+from memory_budget import MemoryBudget, current_rss
+from report_generator import ReportGenerator
+from trust_scorer import TrustScorer
+from trust_verifier import TrustVerifier, TRUSTED_ACCOUNTS
+from tweet_monitor import TweetMonitor
+
+MB = 1024 * 1024
+AUTHOR_ID_STRIDE = 10 ** 9  # Fake tweet ids are author_id * stride + sequence number
+
+
+class FakeClient:
+    """
+    Stands in for tweepy.Client with deterministic, endless data and no network
+    Every search returns fresh trigger replies to tweets by one of `accounts` authors,
+    so caches see both repeat and new accounts the way a busy day would.
+    """
+
+    def __init__(self, accounts: int = 5000, replies_per_poll: int = 10):
+        self.accounts = accounts
+        self.replies_per_poll = replies_per_poll
+        self._ids = count(10_000_000)
+        self.replies_posted = 0
+
+    def _user(self, user_id: int) -> tweepy.User:
+        return tweepy.User({
+            "id": str(user_id),
+            "name": f"Account {user_id}",
+            "username": f"acct{user_id}",
+            "created_at": "2021-03-01T00:00:00.000Z",
+            "description": "Building on Solana https://example.com",
+            "verified": user_id % 7 == 0,
+            "public_metrics": {
+                "followers_count": 1000 + user_id % 997 * 10,
+                "following_count": 300 + user_id % 89,
+                "tweet_count": 4000,
+                "listed_count": 12
+            }
+        })
+
+    def _tweet(self, tweet_id: int, author_id: int, **fields) -> tweepy.Tweet:
+        return tweepy.Tweet(dict({
+            "id": str(tweet_id),
+            "text": f"gm from {author_id}",
+            "author_id": str(author_id),
+            "edit_history_tweet_ids": [str(tweet_id)],
+            "public_metrics": {"like_count": tweet_id % 50, "retweet_count": tweet_id % 9,
+                               "reply_count": tweet_id % 5, "quote_count": 0}
+        }, **fields))
+
+    def search_recent_tweets(self, query, tweet_fields=None, max_results=None, since_id=None, next_token=None):
+        replies = []
+        for _ in range(self.replies_per_poll):
+            reply_id = next(self._ids)
+            author_id = reply_id % self.accounts + 1
+            original_id = author_id * AUTHOR_ID_STRIDE + reply_id  # get_tweet recovers the author from the id
+            replies.append(self._tweet(
+                reply_id, 1,
+                text="@projectrugguard riddle me this",
+                conversation_id=str(original_id),
+                referenced_tweets=[{"type": "replied_to", "id": str(original_id)}]
+            ))
+        meta = {"newest_id": replies[-1].id, "result_count": len(replies)}
+        return tweepy.Response(replies, {}, [], meta)
+
+    def get_tweet(self, tweet_id, tweet_fields=None, expansions=None, user_fields=None):
+        author_id = int(tweet_id) // AUTHOR_ID_STRIDE
+        return tweepy.Response(self._tweet(int(tweet_id), author_id), {"users": [self._user(author_id)]}, [], {})
+
+    def get_users_tweets(self, user_id, max_results=100, tweet_fields=None):
+        start = int(user_id) * 1000
+        return tweepy.Response([self._tweet(start + i, int(user_id)) for i in range(max_results)], {}, [], {})
+
+    def get_users_followers(self, user_id, max_results=1000, pagination_token=None, user_fields=None):
+        page = int(pagination_token or 0)
+        followers = [tweepy.User({"id": str(50_000_000 + page * max_results + i), "name": "f",
+                                  "username": f"follower{i}", "verified": False})
+                     for i in range(max_results)]
+        meta = {"next_token": str(page + 1)} if page < 5 else {}
+        return tweepy.Response(followers, {}, [], meta)
+
+    def get_users(self, ids=None, usernames=None, user_fields=None):
+        if usernames:
+            return tweepy.Response([tweepy.User({"id": str(90_000_000 + i), "name": name, "username": name})
+                                    for i, name in enumerate(usernames)], {}, [], {})
+        return tweepy.Response([self._user(int(user_id)) for user_id in ids or []], {}, [], {})
+
+    def create_tweet(self, in_reply_to_tweet_id=None, text=None):
+        self.replies_posted += 1
+        return tweepy.Response({"id": str(next(self._ids)), "text": text}, {}, [], {})
+
+
+class OfflineTrustVerifier(TrustVerifier):
+    def _load_trusted_accounts(self, max_retries: int = 3) -> None:
+        self.trusted_accounts = list(TRUSTED_ACCOUNTS)
+        self.trusted_ids = None
+
+
+def run(polls: int, warmup: int, accounts: int, replies_per_poll: int, budget_mb: int, workdir: str) -> dict:
+    """
+    Drive the bot's poll, analyze, reply, record and enforce cycle polls times
+    Returns RSS after warm-up, peak RSS after warm-up and RSS at the end, in bytes.
+    """
+    client = FakeClient(accounts, replies_per_poll)
+    monitor = TweetMonitor(client)
+    monitor._sleep = lambda seconds: None  # Poll back to back instead of in real time
+    monitor.min_api_interval = 0
+
+    scorer = TrustScorer()
+    report_generator = ReportGenerator(client, scorer)
+    history = HistoryStore(os.path.join(workdir, "history.db"), flush_interval=0.5)
+    sampler = FollowerSampler(client, os.path.join(workdir, "followers.npz"),
+                              max_accounts=2000, sample_interval=0)
+    verifier = OfflineTrustVerifier(client)
+    verifier.follower_window.window_seconds = 0  # Fresh rate window per scan; nothing waits
+    pipeline = AnalysisPipeline(ContextFetcher(client), AccountAnalyzer(client), verifier, report_generator,
+                                sampler=sampler, scorer=scorer, history=history)
+    checkpointer = Checkpointer(os.path.join(workdir, "checkpoint.json"))
+
+    budget = MemoryBudget(budget_mb * MB)
+    budget.register("processed_tweets", monitor.memory_size, monitor.evict_processed)
+    budget.register("history_queue", history.memory_size)
+    budget.register("analysis_cache", pipeline.memory_size, pipeline.evict)
+    budget.register("follower_series", sampler.memory_size)
+
+    baseline = peak = 0
+    try:
+        for poll in range(1, polls + 1):
+            for trigger in monitor.listen_for_trigger():
+                analysis = pipeline.analyze_tweet(trigger["replied_to_id"])
+                report = report_generator.reply_with_report(trigger["reply_id"], analysis)
+                if "error" not in analysis:
+                    history.record(analysis, report, trigger["reply_id"])
+            checkpointer.save({"monitor": monitor.get_state(), "pending_triggers": []})
+            budget.enforce()
+            if poll % 50 == 0:
+                sampler.sample_once()
+
+            if poll == warmup:
+                gc.collect()
+                baseline = current_rss()
+            if poll > warmup and poll % 100 == 0:
+                gc.collect()
+                rss = current_rss()
+                peak = max(peak, rss)
+                print(f"poll {poll}: RSS {rss / MB:.1f} MB, tracked {sum(budget.usage().values()) / MB:.1f} MB, "
+                      f"{client.replies_posted} replies")
+    finally:
+        history.close()
+
+    gc.collect()
+    final = current_rss()
+    return {"baseline": baseline, "peak": max(peak, final), "final": final}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run the bot loop against a fake client and fail if RSS keeps growing"
+    )
+    parser.add_argument("--polls", type=int, default=3000,
+                        help="Polls to run; at one poll a minute, 1440 is a day of traffic")
+    parser.add_argument("--warmup", type=int, default=500, help="Polls before the RSS baseline is taken")
+    parser.add_argument("--accounts", type=int, default=5000, help="Distinct accounts analyzed")
+    parser.add_argument("--replies-per-poll", type=int, default=10)
+    parser.add_argument("--budget-mb", type=int, default=16, help="Memory budget for tracked caches")
+    parser.add_argument("--max-growth-mb", type=float, default=24,
+                        help="Allowed RSS growth after warm-up before the soak fails")
+    args = parser.parse_args()
+
+    if args.warmup >= args.polls:
+        parser.error("--warmup must be smaller than --polls")
+
+    started = time.perf_counter()
+    with tempfile.TemporaryDirectory(prefix="rugguard-soak-") as workdir:
+        result = run(args.polls, args.warmup, args.accounts, args.replies_per_poll, args.budget_mb, workdir)
+    elapsed = time.perf_counter() - started
+
+    growth = result["peak"] - result["baseline"]
+    print(f"{args.polls} polls in {elapsed:.0f}s: RSS {result['baseline'] / MB:.1f} MB after warm-up, "
+          f"peak {result['peak'] / MB:.1f} MB, final {result['final'] / MB:.1f} MB")
+    if result["baseline"] == 0:
+        print("Could not read RSS on this platform")
+        sys.exit(2)
+    if growth > args.max_growth_mb * MB:
+        print(f"FAIL: RSS grew {growth / MB:.1f} MB after warm-up (limit {args.max_growth_mb} MB)")
+        sys.exit(1)
+    print(f"OK: RSS grew {growth / MB:.1f} MB after warm-up (limit {args.max_growth_mb} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# rate_limits.py
+import threading
+import time
+import requests
+import tweepy
+from typing import Optional, Dict, Any
+
+# Failures that say nothing about the request itself; retry it unchanged once the API recovers
+TRANSIENT_ERRORS = (
+    tweepy.errors.TwitterServerError,
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout
+)
+
+
+def reset_seconds(e: tweepy.errors.TooManyRequests, default: Optional[float] = 60) -> Optional[float]:
+    """
+    Seconds until the rate-limit window in a 429 response resets
+    Falls back to default when the x-rate-limit-reset header is missing or unreadable.
+    """
+    try:
+        reset_at = int(e.response.headers["x-rate-limit-reset"])
+    except (AttributeError, KeyError, TypeError, ValueError):
+        return default
+    return max(1.0, reset_at - time.time() + 1)
+
+
+class RateWindow:
+    """
+    Calls spent against one endpoint's fixed rate-limit window, shared across callers
+    Times are wall-clock epoch seconds, like the server's reset header, so the state
+    stays meaningful across a restart.
+    """
+
+    def __init__(self, limit: int, window_seconds: int = 900):
+        self.limit = limit
+        self.window_seconds = window_seconds
+        self._lock = threading.Lock()
+        self._window_start = time.time()
+        self._used = 0
+        self._blocked_until = 0.0
+
+    def _roll(self, now: float) -> None:
+        if now - self._window_start >= self.window_seconds:
+            self._window_start = now
+            self._used = 0
+
+    def try_acquire(self, reserve: int = 0) -> bool:
+        """
+        Spend one call if the window has room; never waits
+        reserve calls are left untouched for higher-priority callers.
+        """
+        now = time.time()
+        with self._lock:
+            if now < self._blocked_until:
+                return False
+            self._roll(now)
+            if self._used >= self.limit - reserve:
+                return False
+            self._used += 1
+            return True
+
+    def exhausted(self, e: tweepy.errors.TooManyRequests) -> None:
+        """Record a 429 so no caller spends calls until the server's reset time"""
+        with self._lock:
+            self._blocked_until = time.time() + reset_seconds(e, self.window_seconds)
+
+    def remaining(self) -> int:
+        now = time.time()
+        with self._lock:
+            if now < self._blocked_until:
+                return 0
+            self._roll(now)
+            return self.limit - self._used
+
+    def get_state(self) -> Dict[str, Any]:
+        """Window start, calls used and any 429 block as JSON-serializable data for checkpoints"""
+        with self._lock:
+            return {
+                "window_start": self._window_start,
+                "used": self._used,
+                "blocked_until": self._blocked_until
+            }
+
+    def load_state(self, state: Dict[str, Any]) -> None:
+        """
+        Restore state saved by get_state; a window that ended while stopped starts afresh
+        A start in the future (clock moved back) is clamped to now rather than trusted.
+        """
+        now = time.time()
+        with self._lock:
+            self._window_start = min(float(state.get("window_start", now)), now)
+            self._used = int(state.get("used", 0))
+            self._blocked_until = float(state.get("blocked_until", 0.0))
+            self._roll(now)
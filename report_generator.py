@@ -1,95 +1,98 @@
 # report_generator.py
 import tweepy
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+from trust_scorer import TrustScorer
+from rate_limits import TRANSIENT_ERRORS
 
 class ReportGenerator:
-    def __init__(self, client: tweepy.Client):
+    def __init__(self, client: tweepy.Client, scorer: Optional[TrustScorer] = None):
         self.client = client
+        self.scorer = scorer or TrustScorer()
+        self._username = None  # Our own handle, looked up on first use
 
-    def reply_with_report(self, tweet_id: str, analysis: Dict[str, Any]) -> None:
+    def reply_with_report(self, tweet_id: str, analysis: Dict[str, Any]) -> Optional[str]:
         """
-        Format and post a trustworthiness report as a reply
+        Post a trustworthiness report as a reply
+        Uses the report already rendered into the analysis when there is one; the analysis
+        may be a shared cached entry, so it is only read. Returns the posted report text, or
+        None if only an error notice was posted. Raises when nothing could be posted, so the
+        caller keeps the trigger: rate limits and TRANSIENT_ERRORS as-is, for a plain retry.
         """
-        try:
-            if "error" in analysis:
-                self.client.create_tweet(
-                    in_reply_to_tweet_id=tweet_id,
-                    text=f"Error analyzing account: {analysis['error']}"
-                )
-                return
+        if "error" in analysis:
+            self.client.create_tweet(
+                in_reply_to_tweet_id=tweet_id,
+                text=f"Error analyzing account: {analysis['error']}"
+            )
+            return None
 
-            # Format the report
-            report = self._format_report(analysis)
-            
+        report = analysis.get("report") or self._format_report(analysis)
+        try:
             # Post the reply
             self.client.create_tweet(
                 in_reply_to_tweet_id=tweet_id,
                 text=report
             )
-
-        except Exception as e:
+            return report
+        except (tweepy.errors.TooManyRequests,) + TRANSIENT_ERRORS:
+            raise
+        except tweepy.errors.TweepyException as e:
+            # The report itself was refused (e.g. 403); a short notice may still go through
             print(f"Error posting reply: {e}")
-            try:
-                self.client.create_tweet(
-                    in_reply_to_tweet_id=tweet_id,
-                    text="Error generating trust report. Please try again later."
-                )
-            except:
-                pass
+            self.client.create_tweet(
+                in_reply_to_tweet_id=tweet_id,
+                text="Error generating trust report. Please try again later."
+            )
+            return None
+
+    def has_replied(self, tweet_id: str, conversation_id: Optional[str] = None) -> bool:
+        """
+        Whether this account already replied to tweet_id, for triggers interrupted mid-post
+        Searches our own recent replies, within the conversation when it is known.
+        """
+        if self._username is None:
+            self._username = self.client.get_me().data.username
+        query = f"from:{self._username} is:reply"
+        if conversation_id:
+            query += f" conversation_id:{conversation_id}"
+        replies = self.client.search_recent_tweets(query=query, tweet_fields=["referenced_tweets"], max_results=100)
+        return any(
+            ref.type == "replied_to" and str(ref.id) == str(tweet_id)
+            for reply in replies.data or []
+            for ref in reply.referenced_tweets or []
+        )
 
     def _format_report(self, analysis: Dict[str, Any]) -> str:
         """
         Format the analysis into a readable report
+        Uses the score attached during analysis; the analysis itself is never modified.
         """
-        # Trust indicators
-        trust_indicators = []
-        
-        # Account age
-        if analysis["account_age_days"] > 365:
-            trust_indicators.append("Account > 1 year old")
-        elif analysis["account_age_days"] > 180:
-            trust_indicators.append("Account 6-12 months old")
+        if "trust_score" in analysis and "score_breakdown" in analysis:
+            score, breakdown = analysis["trust_score"], analysis["score_breakdown"]
         else:
-            trust_indicators.append("Account < 6 months old")
+            result = self.scorer.score(analysis)
+            score, breakdown = result["score"], result["rules"]
 
-        # Verification status
-        if analysis["verified"]:
-            trust_indicators.append("Verified account")
+        # Trust indicators come from the rules that fired in the scorer
+        trust_indicators = [rule["label"] for rule in breakdown]
 
-        # Follower ratio
-        if analysis["follower_ratio"] > 1:
-            trust_indicators.append("More followers than following")
-        elif analysis["follower_ratio"] > 0.5:
-            trust_indicators.append("Moderate follower ratio")
-        else:
-            trust_indicators.append("Low follower ratio")
-
-        # Bio analysis
-        if analysis["bio_has_links"]:
-            trust_indicators.append("Bio contains links")
-        if analysis["bio_has_emoji"]:
-            trust_indicators.append("Bio contains emojis")
-
-        # Engagement metrics
-        if analysis["avg_likes"] > 10:
-            trust_indicators.append("Good engagement (likes)")
-        if analysis["avg_retweets"] > 5:
-            trust_indicators.append("Good engagement (retweets)")
-
-        # Vouch status
-        if analysis.get("vouched", False):
-            trust_indicators.append(f"Vouched by {analysis.get('vouch_count', 0)} trusted accounts")
-            if analysis.get("trusted_followers"):
-                trust_indicators.append(f"Trusted followers: {', '.join(analysis['trusted_followers'][:3])}")
+        if analysis.get("vouched", False) and analysis.get("trusted_followers"):
+            usernames = [f["username"] for f in analysis["trusted_followers"][:3]]
+            trust_indicators.append(f"Trusted followers: {', '.join(usernames)}")
+        elif analysis.get("vouch_error"):
+            trust_indicators.append("Vouch check unavailable, try again later")
+        elif analysis.get("vouch_partial"):
+            trust_indicators.append("Vouch check partial (follower scan budget reached)")
 
         # Format the report
-        report = f"Trust Report for @{analysis['username']}\n\n"
+        report = f"Trust Report for @{analysis['username']}\n"
+        report += f"Trust Score: {score:.0f}/100\n\n"
         report += "\n".join(trust_indicators)
         report += f"\n\nStats:"
         report += f"\n• {analysis['followers_count']:,} followers"
         report += f"\n• {analysis['following_count']:,} following"
+        if analysis.get("follower_samples", 0) >= 2:
+            report += f"\n• {analysis['follower_growth_per_day']:+,.1f} followers/day"
         report += f"\n• {analysis['tweet_count']:,} tweets analyzed"
         report += f"\n• Account age: {analysis['account_age_days']} days"
         
         return report
-
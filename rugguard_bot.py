@@ -2,11 +2,23 @@
 import tweepy
 import time
 import os
+import signal
+import threading
+from collections import deque
 from dotenv import load_dotenv
 from tweet_monitor import TweetMonitor
 from account_analyzer import AccountAnalyzer
 from trust_verifier import TrustVerifier
 from report_generator import ReportGenerator
+from fetch_context import ContextFetcher
+from trust_scorer import TrustScorer
+from history_store import HistoryStore
+from memory_budget import MemoryBudget, estimate_size
+from checkpoint import Checkpointer
+from analysis_pipeline import AnalysisPipeline
+from analysis_api import AnalysisServer
+from follower_series import FollowerSampler
+from rate_limits import reset_seconds, TRANSIENT_ERRORS
 from datetime import datetime
 
 # Load environment variables
@@ -18,6 +30,19 @@ API_SECRET = os.getenv("API_SECRET")
 ACCESS_TOKEN = os.getenv("ACCESS_TOKEN")
 ACCESS_TOKEN_SECRET = os.getenv("ACCESS_TOKEN_SECRET")
 BEARER_TOKEN = os.getenv("BEARER_TOKEN")
+TRUST_RULES_PATH = os.getenv("TRUST_RULES_PATH")  # Optional JSON scoring rules
+HISTORY_DB_PATH = os.getenv("HISTORY_DB_PATH", "rugguard_history.db")
+MEMORY_BUDGET_MB = int(os.getenv("MEMORY_BUDGET_MB", "256"))
+CHECKPOINT_PATH = os.getenv("CHECKPOINT_PATH", "rugguard_checkpoint.json")
+CHECKPOINT_INTERVAL = int(os.getenv("CHECKPOINT_INTERVAL", "30"))  # Seconds between periodic checkpoints
+MAX_TRIGGER_ATTEMPTS = int(os.getenv("MAX_TRIGGER_ATTEMPTS", "3"))  # Failures before a trigger is dead-lettered
+TARGET_HANDLES = os.getenv("TARGET_HANDLES", "projectrugguard").split(",")
+TRIGGER_PHRASES = os.getenv("TRIGGER_PHRASES", "riddle me this").split(",")
+FOLLOWER_SERIES_PATH = os.getenv("FOLLOWER_SERIES_PATH", "rugguard_followers.npz")
+FOLLOWER_SAMPLE_CALLS = int(os.getenv("FOLLOWER_SAMPLE_CALLS", "10"))  # User lookups per 15 minutes
+WATCHED_USER_IDS = [u for u in os.getenv("WATCHED_USER_IDS", "").split(",") if u.strip()]
+ANALYSIS_API_HOST = os.getenv("ANALYSIS_API_HOST", "127.0.0.1")
+ANALYSIS_API_PORT = os.getenv("ANALYSIS_API_PORT")  # Local HTTP API is off unless set
 
 # Validate environment variables
 required_vars = {
@@ -44,7 +69,9 @@ try:
         consumer_secret=API_SECRET,
         access_token=ACCESS_TOKEN,
         access_token_secret=ACCESS_TOKEN_SECRET,
-        wait_on_rate_limit=True  # Automatically handle rate limits
+        # 429s raise instead of sleeping inside tweepy, so every wait goes through
+        # the shutdown-aware waits below and in each component
+        wait_on_rate_limit=False
     )
 
     # Test authentication
@@ -52,10 +79,35 @@ try:
     print("Successfully authenticated with Twitter API")
 
     # Initialize bot components
-    tweet_monitor = TweetMonitor(client)
+    shutdown_event = threading.Event()
+    pending_triggers = deque()  # Discovered but not yet answered, checkpointed
+    dead_triggers = deque(maxlen=100)  # Gave up after MAX_TRIGGER_ATTEMPTS, kept for inspection
+    checkpointer = Checkpointer(CHECKPOINT_PATH)
+    tweet_monitor = TweetMonitor(client, shutdown_event, TARGET_HANDLES, TRIGGER_PHRASES)
+    context_fetcher = ContextFetcher(client)
     account_analyzer = AccountAnalyzer(client)
     trust_verifier = TrustVerifier(client)
-    report_generator = ReportGenerator(client)
+    trust_scorer = TrustScorer.from_file(TRUST_RULES_PATH) if TRUST_RULES_PATH else TrustScorer()
+    report_generator = ReportGenerator(client, trust_scorer)
+    history_store = HistoryStore(HISTORY_DB_PATH)
+    follower_sampler = FollowerSampler(client, FOLLOWER_SERIES_PATH, calls_per_window=FOLLOWER_SAMPLE_CALLS)
+    follower_sampler.load()
+    follower_sampler.watch(WATCHED_USER_IDS)
+    analysis_pipeline = AnalysisPipeline(context_fetcher, account_analyzer, trust_verifier, report_generator,
+                                         sampler=follower_sampler, scorer=trust_scorer, history=history_store)
+    analysis_server = None
+    if ANALYSIS_API_PORT:
+        analysis_server = AnalysisServer((ANALYSIS_API_HOST, int(ANALYSIS_API_PORT)), analysis_pipeline)
+
+    # Every long-lived cache and queue is accounted against one budget
+    memory_budget = MemoryBudget(MEMORY_BUDGET_MB * 1024 * 1024)
+    memory_budget.register("processed_tweets", tweet_monitor.memory_size, tweet_monitor.evict_processed)
+    memory_budget.register("history_queue", history_store.memory_size)
+    memory_budget.register("analysis_cache", analysis_pipeline.memory_size, analysis_pipeline.evict)
+    memory_budget.register("follower_series", follower_sampler.memory_size)
+    # Unanswered work is counted but never evicted
+    memory_budget.register("pending_triggers", lambda: estimate_size(pending_triggers))
+    memory_budget.register("dead_triggers", lambda: estimate_size(dead_triggers))
 
 except tweepy.errors.Unauthorized as e:
     print("Error: Twitter API authentication failed")
@@ -65,42 +117,144 @@ except Exception as e:
     print(f"Error initializing Twitter client: {e}")
     exit(1)
 
+def request_memory_report(signum=None, frame=None):
+    """SIGUSR1: flag a memory report; the reporter thread prints it outside signal context"""
+    memory_budget.request_report()
+
+def request_stop_tracing(signum=None, frame=None):
+    """SIGUSR2: flag that tracemalloc should be turned off again"""
+    memory_budget.request_stop_tracing()
+
+def request_shutdown(signum=None, frame=None):
+    """Stop taking new work; the current trigger finishes and state is checkpointed"""
+    print(f"\n[{datetime.now()}] Shutdown requested, finishing in-flight work...")
+    shutdown_event.set()
+
+def save_checkpoint():
+    try:
+        checkpointer.save({
+            "saved_at": datetime.now().isoformat(),
+            "monitor": tweet_monitor.get_state(),
+            "verifier": trust_verifier.get_state(),
+            "pending_triggers": list(pending_triggers),
+            "dead_triggers": list(dead_triggers)
+        })
+    except Exception as e:
+        print(f"Error saving checkpoint: {e}")
+
+def restore_checkpoint():
+    state = checkpointer.load()
+    if not state:
+        return
+    tweet_monitor.load_state(state.get("monitor", {}))
+    trust_verifier.load_state(state.get("verifier", {}))
+    pending_triggers.extend(state.get("pending_triggers", []))
+    dead_triggers.extend(state.get("dead_triggers", []))
+    print(f"Resumed from checkpoint saved at {state.get('saved_at')} "
+          f"with {len(pending_triggers)} pending trigger(s)")
+
+def process_trigger(trigger):
+    print(f"\n[{datetime.now()}] Processing new trigger tweet for @{trigger.get('handle')}...")
+    if not trigger.get("replied_to_id"):
+        return
+
+    print(f"[{datetime.now()}] Starting account analysis and trust checks...")
+    # Fetch once, analyze, vouch-check and score through the shared cached pipeline
+    analysis = analysis_pipeline.analyze_tweet(trigger["replied_to_id"])
+    if analysis.get("error") == "Original tweet not found":
+        return
+
+    print(f"[{datetime.now()}] Generating and posting report...")
+    # Persist the intent first: if we die after posting but before the trigger is
+    # dropped, the restart checks for our reply instead of answering twice
+    trigger["posting"] = True
+    save_checkpoint()
+    report = report_generator.reply_with_report(trigger["reply_id"], analysis)
+    if "error" not in analysis:
+        # Queued for the background writer, off the reply path
+        history_store.record(analysis, report, trigger["reply_id"])
+    print(f"[{datetime.now()}] Report posted successfully\n")
+
 def main():
     print("Starting RUGGUARD Trust Bot...")
-    while True:
+    if hasattr(signal, "SIGUSR1"):
+        signal.signal(signal.SIGUSR1, request_memory_report)
+        signal.signal(signal.SIGUSR2, request_stop_tracing)
+    signal.signal(signal.SIGTERM, request_shutdown)
+    signal.signal(signal.SIGINT, request_shutdown)
+
+    restore_checkpoint()
+    memory_budget.start_reporter(shutdown_event)
+    follower_sampler.start()
+    if analysis_server:
+        analysis_server.start()
+    last_checkpoint = time.monotonic()
+
+    while not shutdown_event.is_set():
         try:
-            # Listen for replies mentioning @projectruggaurd with the phrase
-            tweets = tweet_monitor.listen_for_trigger()
-            for tweet in tweets:
-                print(f"\n[{datetime.now()}] Processing new trigger tweet...")
-                
-                # Extract original tweet and author
-                original_author_id = tweet_monitor.get_original_author_id(tweet)
-                if not original_author_id:
+            # Listen for replies mentioning any watched handle with any trigger phrase
+            if not pending_triggers:
+                pending_triggers.extend(tweet_monitor.listen_for_trigger())
+                save_checkpoint()
+
+            while pending_triggers and not shutdown_event.is_set():
+                trigger = pending_triggers[0]
+                try:
+                    if trigger.get("posting") and report_generator.has_replied(
+                            trigger["reply_id"], trigger.get("conversation_id")):
+                        print(f"Trigger {trigger['reply_id']} was already answered before a restart")
+                    else:
+                        process_trigger(trigger)
+                except tweepy.errors.TooManyRequests:
+                    # Not the trigger's fault; it stays at the head until the window resets
+                    raise
+                except TRANSIENT_ERRORS as e:
+                    # Neither is this; keep it at the head without spending an attempt
+                    print(f"Transient error processing trigger {trigger.get('reply_id')}, retrying: {e}")
+                    save_checkpoint()
+                    shutdown_event.wait(30)
+                    continue
+                except Exception as e:
+                    trigger["attempts"] = trigger.get("attempts", 0) + 1
+                    pending_triggers.popleft()
+                    if trigger["attempts"] >= MAX_TRIGGER_ATTEMPTS:
+                        print(f"Giving up on trigger {trigger.get('reply_id')} after "
+                              f"{trigger['attempts']} attempts: {e}")
+                        dead_triggers.append(dict(trigger, last_error=str(e)))
+                    else:
+                        print(f"Error processing trigger {trigger.get('reply_id')} "
+                              f"(attempt {trigger['attempts']}): {e}")
+                        # Retry later, behind the other pending triggers
+                        pending_triggers.append(trigger)
+                    save_checkpoint()
+                    shutdown_event.wait(10 * trigger["attempts"])
                     continue
 
-                print(f"[{datetime.now()}] Starting account analysis...")
-                # Analyze the original author
-                analysis = account_analyzer.analyze_user(original_author_id)
-                
-                print(f"[{datetime.now()}] Checking trusted account relationships...")
-                # Check if vouched by trusted accounts
-                vouched = trust_verifier.is_vouched(original_author_id)
-                analysis["vouched"] = vouched["vouched"]
-                analysis["vouch_count"] = vouched["vouch_count"]
-                analysis["trusted_followers"] = vouched["trusted_followers"]
-
-                print(f"[{datetime.now()}] Generating and posting report...")
-                # Reply with the trustworthiness report
-                report_generator.reply_with_report(tweet.id, analysis)
-                print(f"[{datetime.now()}] Report posted successfully\n")
+                # Drop the trigger only once answered, and persist that right away
+                pending_triggers.popleft()
+                save_checkpoint()
+                last_checkpoint = time.monotonic()
+
+            memory_budget.enforce()
+            if time.monotonic() - last_checkpoint > CHECKPOINT_INTERVAL:
+                save_checkpoint()
+                last_checkpoint = time.monotonic()
                 
         except tweepy.errors.TooManyRequests as e:
-            print(f"Rate limit exceeded. Waiting for {e.reset_time} seconds...")
-            time.sleep(e.reset_time)
+            wait_time = reset_seconds(e)
+            print(f"Rate limit exceeded. Waiting for {int(wait_time)} seconds...")
+            save_checkpoint()
+            shutdown_event.wait(wait_time)
         except Exception as e:
             print(f"Error in main loop: {e}")
-            time.sleep(60)  # Wait before retrying
+            shutdown_event.wait(60)  # Wait before retrying
+
+    save_checkpoint()
+    if analysis_server:
+        analysis_server.stop()
+    follower_sampler.stop()
+    history_store.close()
+    print(f"[{datetime.now()}] RUGGUARD Trust Bot stopped cleanly")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
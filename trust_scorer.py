@@ -0,0 +1,140 @@
+# trust_scorer.py
+import json
+import string
+import numpy as np
+from typing import List, Dict, Any, Optional
+
+# Analysis fields the scorer reads, in feature-matrix column order
+FEATURES = [
+    "account_age_days",
+    "verified",
+    "follower_ratio",
+    "bio_has_links",
+    "bio_has_emoji",
+    "avg_likes",
+    "avg_retweets",
+    "vouched",
+    "follower_burst_pct"
+]
+
+# A rule fires when min < feature <= max. Labels are formatted with the analysis dict;
+# fields it lacks show as "?".
+DEFAULT_RULES = [
+    {"name": "age_over_1y", "feature": "account_age_days", "min": 365, "weight": 25, "label": "Account > 1 year old"},
+    {"name": "age_6_12m", "feature": "account_age_days", "min": 180, "max": 365, "weight": 10, "label": "Account 6-12 months old"},
+    {"name": "age_under_6m", "feature": "account_age_days", "max": 180, "weight": -15, "label": "Account < 6 months old"},
+    {"name": "verified", "feature": "verified", "min": 0, "weight": 10, "label": "Verified account"},
+    {"name": "ratio_high", "feature": "follower_ratio", "min": 1, "weight": 15, "label": "More followers than following"},
+    {"name": "ratio_moderate", "feature": "follower_ratio", "min": 0.5, "max": 1, "weight": 5, "label": "Moderate follower ratio"},
+    {"name": "ratio_low", "feature": "follower_ratio", "max": 0.5, "weight": -10, "label": "Low follower ratio"},
+    {"name": "bio_links", "feature": "bio_has_links", "min": 0, "weight": 0, "label": "Bio contains links"},
+    {"name": "bio_emoji", "feature": "bio_has_emoji", "min": 0, "weight": 0, "label": "Bio contains emojis"},
+    {"name": "likes_good", "feature": "avg_likes", "min": 10, "weight": 10, "label": "Good engagement (likes)"},
+    {"name": "retweets_good", "feature": "avg_retweets", "min": 5, "weight": 5, "label": "Good engagement (retweets)"},
+    {"name": "vouched", "feature": "vouched", "min": 0, "weight": 25, "label": "Vouched by {vouch_count} trusted accounts"},
+    {"name": "follower_spike", "feature": "follower_burst_pct", "min": 20, "weight": -25, "label": "Follower spike: +{follower_burst_pct}% in one interval"}
+]
+
+BASE_SCORE = 40
+MIN_SCORE = 0
+MAX_SCORE = 100
+MISSING_LABEL_VALUE = "?"
+
+
+class LabelFields(dict):
+    """Analysis view for label formatting; fields the analysis lacks render as MISSING_LABEL_VALUE"""
+
+    def __missing__(self, key: str) -> str:
+        return MISSING_LABEL_VALUE
+
+
+class TrustScorer:
+    def __init__(self, rules: Optional[List[Dict[str, Any]]] = None, base_score: float = BASE_SCORE):
+        self.rules = list(rules if rules is not None else DEFAULT_RULES)
+        self.base_score = base_score
+        self._compile()
+
+    @classmethod
+    def from_file(cls, path: str) -> "TrustScorer":
+        """
+        Load a rule config of the form {"base_score": 40, "rules": [...]}
+        """
+        with open(path) as f:
+            config = json.load(f)
+        return cls(config["rules"], config.get("base_score", BASE_SCORE))
+
+    def _compile(self) -> None:
+        """
+        Turn the rule list into column indexes, bounds and weights for matrix evaluation
+        """
+        for rule in self.rules:
+            if rule["feature"] not in FEATURES:
+                raise ValueError(f"Unknown feature in rule {rule['name']}: {rule['feature']}")
+            # Labels may only name plain analysis fields, so a bad config fails here, not mid-reply
+            for _, field, _, _ in string.Formatter().parse(rule["label"]):
+                if field is not None and not field.isidentifier():
+                    raise ValueError(f"Invalid placeholder in label of rule {rule['name']}: {{{field}}}")
+
+        self._columns = np.array([FEATURES.index(r["feature"]) for r in self.rules], dtype=np.intp)
+        self._lower = np.array([r.get("min", -np.inf) for r in self.rules], dtype=np.float64)
+        self._upper = np.array([r.get("max", np.inf) for r in self.rules], dtype=np.float64)
+        self._weights = np.array([r["weight"] for r in self.rules], dtype=np.float64)
+
+    def features(self, analyses: List[Dict[str, Any]]) -> np.ndarray:
+        """
+        Build the (accounts x features) matrix; missing values count as 0
+        """
+        return np.array(
+            [[float(a.get(name) or 0) for name in FEATURES] for a in analyses],
+            dtype=np.float64
+        ).reshape(len(analyses), len(FEATURES))
+
+    def score_matrix(self, matrix: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Score every row of a feature matrix in one pass
+        """
+        values = matrix[:, self._columns]
+        fired = (values > self._lower) & (values <= self._upper)
+        contributions = fired * self._weights
+        scores = np.clip(self.base_score + contributions.sum(axis=1), MIN_SCORE, MAX_SCORE)
+        return {
+            "scores": scores,
+            "fired": fired,
+            "contributions": contributions
+        }
+
+    def score_batch(self, analyses: List[Dict[str, Any]]) -> np.ndarray:
+        """
+        Score a batch of analyses and return one score per account
+        """
+        return self.score_matrix(self.features(analyses))["scores"]
+
+    def score(self, analysis: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Score one analysis and keep the per-rule contributions for the report
+        """
+        result = self.score_matrix(self.features([analysis]))
+        fired = result["fired"][0]
+        contributions = result["contributions"][0]
+
+        rules = []
+        for i, rule in enumerate(self.rules):
+            if fired[i]:
+                rules.append({
+                    "name": rule["name"],
+                    "label": self._label(rule, analysis),
+                    "contribution": float(contributions[i])
+                })
+
+        return {
+            "score": round(float(result["scores"][0]), 1),
+            "rules": rules
+        }
+
+    def _label(self, rule: Dict[str, Any], analysis: Dict[str, Any]) -> str:
+        """Fill a rule label from the analysis; a missing or unformattable field never fails scoring"""
+        try:
+            return rule["label"].format_map(LabelFields(analysis))
+        except (ValueError, TypeError):
+            # e.g. a numeric format spec applied to MISSING_LABEL_VALUE
+            return rule["label"]
@@ -1,15 +1,22 @@
 # trust_verifier.py
 import tweepy
-from typing import List, Dict, Any
-from datetime import datetime
+from typing import Dict, Any
 import requests
 import time
 from requests.exceptions import RequestException
+from rate_limits import RateWindow, reset_seconds
 
 class TrustVerifier:
     def __init__(self, client: tweepy.Client):
         self.client = client
         self.trusted_accounts = []
+        self.trusted_ids = None  # Trusted user id -> username, resolved on first scan
+        self.resolve_retry_at = 0.0  # Epoch seconds before which a failed resolution is not retried
+        self.resolve_retry_delay = 300  # Wait after a non-429 resolution failure
+        self.vouch_threshold = 2  # Vouched if followed by at least 2 trusted accounts
+        self.max_follower_pages = 3  # 1000 followers per page, at most 3 of the window's 15 per scan
+        self.follower_window = RateWindow(15, 900)  # Follower lookups spent across all scans
+        self.scan_time_budget = 30  # Seconds before a scan settles for a partial verdict
         self._load_trusted_accounts()
 
     def _load_trusted_accounts(self, max_retries: int = 3) -> None:
@@ -25,6 +32,7 @@ class TrustVerifier:
                 
                 # Split by newlines and filter out empty lines
                 self.trusted_accounts = [line.strip() for line in response.text.split('\n') if line.strip()]
+                self.trusted_ids = None
                 
                 if not self.trusted_accounts:
                     raise ValueError("No trusted accounts loaded from GitHub")
@@ -45,69 +53,133 @@ class TrustVerifier:
                 self.trusted_accounts = []
                 return
 
-    def is_vouched(self, user_id: str) -> Dict:
+    def _resolve_trusted_ids(self) -> Dict[str, str]:
         """
-        Check if a user is followed by at least 2 trusted accounts
-        Returns a dictionary with vouch status and details
+        Map trusted account ids to usernames, resolved once in batches of 100
+        Falls back to an empty map (username matching) if the lookup fails, and does not
+        try again until the rate-limit reset or resolve_retry_delay has passed.
+        """
+        if self.trusted_ids is not None:
+            return self.trusted_ids
+        if time.time() < self.resolve_retry_at:
+            return {}
+
+        trusted_ids = {}
+        try:
+            for start in range(0, len(self.trusted_accounts), 100):
+                batch = [name.lstrip("@") for name in self.trusted_accounts[start:start + 100]]
+                users = self.client.get_users(usernames=batch)
+                for user in users.data or []:
+                    trusted_ids[str(user.id)] = user.username
+            self.trusted_ids = trusted_ids
+        except tweepy.errors.TooManyRequests as e:
+            wait = reset_seconds(e, 900)
+            self.resolve_retry_at = time.time() + wait
+            print(f"Rate limited resolving trusted account ids, matching by username for {int(wait)} seconds")
+            return {}
+        except Exception as e:
+            self.resolve_retry_at = time.time() + self.resolve_retry_delay
+            print(f"Error resolving trusted account ids, matching by username: {e}")
+            return {}
+        return self.trusted_ids
+
+    def get_state(self) -> Dict[str, Any]:
+        """Rate-window usage to checkpoint, so a restart does not spend calls the server will refuse"""
+        return {
+            "follower_window": self.follower_window.get_state(),
+            "resolve_retry_at": self.resolve_retry_at
+        }
+
+    def load_state(self, state: Dict[str, Any]) -> None:
+        if state.get("follower_window"):
+            self.follower_window.load_state(state["follower_window"])
+        self.resolve_retry_at = float(state.get("resolve_retry_at", 0.0))
+
+    def is_vouched(self, user_id: str, reserve: int = 0) -> Dict:
+        """
+        Check if a user is followed by at least vouch_threshold trusted accounts
+        Follower pages are streamed lazily and the scan stops as soon as the threshold
+        is reached or the page/time/rate-window budget runs out. "partial" is True when the
+        budget ran out first, i.e. a negative verdict may be missing vouches; "error" is
+        set instead when the check could not run at all. reserve follower calls in the
+        rate window are left for other callers, e.g. replies when serving the API.
         """
         if not self.trusted_accounts:
             return {
                 "vouched": False,
                 "vouch_count": 0,
                 "trusted_followers": [],
+                "complete": False,
+                "partial": False,
+                "pages_scanned": 0,
                 "error": "Trusted accounts list not loaded"
             }
 
+        trusted_ids = self._resolve_trusted_ids()
+        trusted_names = {name.lstrip("@").lower() for name in self.trusted_accounts}
+        trusted_followers = []
+        pages_scanned = 0
+        partial = False
+        pagination_token = None
+        deadline = time.monotonic() + self.scan_time_budget
+
         try:
-            # Get the user's followers with rate limit handling
-            followers = self.client.get_users_followers(
-                user_id,
-                max_results=10,  # Minimum reasonable number
-                user_fields=['username', 'verified']
-            )
-            
-            if not followers.data:
-                return {
-                    "vouched": False,
-                    "vouch_count": 0,
-                    "trusted_followers": [],
-                    "error": "No followers found"
-                }
-            
-            # Check which trusted accounts follow this user
-            trusted_followers = []
-            for follower in followers.data:
-                if follower.username in self.trusted_accounts:
-                    trusted_followers.append({
-                        "username": follower.username,
-                        "verified": follower.verified
-                    })
-            
+            while True:
+                if (pages_scanned >= self.max_follower_pages or time.monotonic() > deadline
+                        or not self.follower_window.try_acquire(reserve)):
+                    # Stopped on budget; any further pages are unscanned
+                    partial = True
+                    break
+
+                try:
+                    page = self.client.get_users_followers(
+                        user_id,
+                        max_results=1000,
+                        pagination_token=pagination_token,
+                        user_fields=['username', 'verified']
+                    )
+                except tweepy.errors.TooManyRequests as e:
+                    # Keep whatever was found; later scans skip the API until the reset
+                    self.follower_window.exhausted(e)
+                    print("Follower lookup rate limited, returning a partial vouch verdict")
+                    partial = True
+                    break
+
+                pages_scanned += 1
+                for follower in page.data or []:
+                    if str(follower.id) in trusted_ids or follower.username.lower() in trusted_names:
+                        trusted_followers.append({
+                            "username": follower.username,
+                            "verified": follower.verified
+                        })
+
+                pagination_token = (page.meta or {}).get("next_token")
+                if len(trusted_followers) >= self.vouch_threshold or not pagination_token:
+                    break
+
             vouch_count = len(trusted_followers)
-            is_vouched = vouch_count >= 2  # Vouched if followed by at least 2 trusted accounts
-            
+            is_vouched = vouch_count >= self.vouch_threshold
+            partial = partial and not is_vouched
+
             return {
                 "vouched": is_vouched,
                 "vouch_count": vouch_count,
                 "trusted_followers": trusted_followers,
+                "complete": not partial,
+                "partial": partial,
+                "pages_scanned": pages_scanned,
                 "error": None
             }
-            
-        except tweepy.errors.TooManyRequests as e:
-            print(f"Rate limit exceeded. Waiting for {e.reset_time} seconds...")
-            time.sleep(e.reset_time)
-            return {
-                "vouched": False,
-                "vouch_count": 0,
-                "trusted_followers": [],
-                "error": f"Rate limit exceeded. Try again in {e.reset_time} seconds"
-            }
+
         except tweepy.errors.TwitterServerError as e:
             print(f"Twitter server error: {e}")
             return {
                 "vouched": False,
                 "vouch_count": 0,
                 "trusted_followers": [],
+                "complete": False,
+                "partial": False,
+                "pages_scanned": pages_scanned,
                 "error": "Twitter server error. Please try again later"
             }
         except Exception as e:
@@ -116,204 +188,12 @@ class TrustVerifier:
                 "vouched": False,
                 "vouch_count": 0,
                 "trusted_followers": [],
+                "complete": False,
+                "partial": False,
+                "pages_scanned": pages_scanned,
                 "error": f"Unexpected error: {str(e)}"
             }
 
-    def listen_for_trigger(self) -> List[tweepy.Tweet]:
-        try:
-            # Enhanced tweet monitoring with comprehensive fields
-            query = "@projectruggaurd -is:retweet"
-            tweets = self.client.search_recent_tweets(
-                query=query,
-                tweet_fields=[
-                    "created_at",
-                    "conversation_id",
-                    "public_metrics",
-                    "context_annotations",
-                    "entities",
-                    "author_id",
-                    "in_reply_to_user_id",
-                    "referenced_tweets",
-                    "lang",
-                    "source",
-                    "possibly_sensitive"
-                ],
-                expansions=[
-                    "author_id",
-                    "referenced_tweets.id",
-                    "in_reply_to_user_id",
-                    "entities.mentions.username",
-                    "attachments.media_keys"
-                ],
-                user_fields=[
-                    "created_at",
-                    "description",
-                    "entities",
-                    "location",
-                    "name",
-                    "pinned_tweet_id",
-                    "profile_image_url",
-                    "protected",
-                    "public_metrics",
-                    "url",
-                    "username",
-                    "verified"
-                ],
-                media_fields=[
-                    "duration_ms",
-                    "height",
-                    "media_key",
-                    "preview_image_url",
-                    "type",
-                    "url",
-                    "width",
-                    "public_metrics"
-                ],
-                max_results=10
-            )
-            return tweets.data
-        except Exception as e:
-            print(f"Error listening for trigger: {e}")
-            return []
-
-    def analyze_user(self, user_id: str) -> Dict[str, Any]:
-        try:
-            # Get comprehensive user information
-            user = self.client.get_user(
-                id=user_id,
-                user_fields=[
-                    "created_at",
-                    "description",
-                    "entities",
-                    "location",
-                    "name",
-                    "pinned_tweet_id",
-                    "profile_image_url",
-                    "protected",
-                    "public_metrics",
-                    "url",
-                    "username",
-                    "verified"
-                ],
-                expansions=["pinned_tweet_id"]
-            )
-            
-            # Get user's tweets with enhanced metrics
-            tweets = self.client.get_users_tweets(
-                user_id,
-                max_results=100,
-                tweet_fields=[
-                    "created_at",
-                    "conversation_id",
-                    "public_metrics",
-                    "context_annotations",
-                    "entities",
-                    "in_reply_to_user_id",
-                    "referenced_tweets",
-                    "lang",
-                    "source",
-                    "possibly_sensitive"
-                ],
-                expansions=[
-                    "referenced_tweets.id",
-                    "in_reply_to_user_id",
-                    "entities.mentions.username",
-                    "attachments.media_keys"
-                ],
-                media_fields=[
-                    "duration_ms",
-                    "height",
-                    "media_key",
-                    "preview_image_url",
-                    "type",
-                    "url",
-                    "width",
-                    "public_metrics"
-                ]
-            )
-
-            return {
-                "user": user,
-                "tweets": tweets
-            }
-        except Exception as e:
-            print(f"Error analyzing user: {e}")
-            return {}
-
-    def reply_with_report(self, tweet_id: str, analysis: Dict[str, Any]) -> None:
-        try:
-            # Format the report from analysis data
-            report = self._format_report(analysis)
-            
-            # Create tweet with enhanced features
-            self.client.create_tweet(
-                in_reply_to_tweet_id=tweet_id,
-                text=report,
-                user_auth=True,
-                media_ids=[],  # Optional: Add media attachments
-                poll_options=[],  # Optional: Add poll
-                reply_settings='everyone'  # Control who can reply
-            )
-        except Exception as e:
-            print(f"Error replying with report: {e}")
-
-    def _format_report(self, analysis: Dict[str, Any]) -> str:
-        """
-        Format the analysis data into a readable report
-        """
-        if not analysis or "user" not in analysis:
-            return "Error: Unable to generate report. Analysis data is incomplete."
-
-        user_data = analysis["user"].data
-        tweets_data = analysis.get("tweets", {}).data or []
-
-        # Basic user information
-        report = f"Trust Report for @{user_data.username}\n\n"
-        
-        # Account age
-        account_age = (datetime.now() - user_data.created_at).days
-        report += f"Account Age: {account_age} days\n"
-        
-        # Verification status
-        if user_data.verified:
-            report += "Status: Verified Account\n"
-        
-        # Follower metrics
-        metrics = user_data.public_metrics
-        report += f"Followers: {metrics.get('followers_count', 0):,}\n"
-        report += f"Following: {metrics.get('following_count', 0):,}\n"
-        
-        # Tweet analysis
-        if tweets_data:
-            total_tweets = len(tweets_data)
-            total_likes = sum(tweet.public_metrics.get('like_count', 0) for tweet in tweets_data)
-            total_retweets = sum(tweet.public_metrics.get('retweet_count', 0) for tweet in tweets_data)
-            
-            report += f"\nTweet Analysis:\n"
-            report += f"- Total Tweets Analyzed: {total_tweets}\n"
-            report += f"- Average Likes: {total_likes/total_tweets:.1f}\n"
-            report += f"- Average Retweets: {total_retweets/total_tweets:.1f}\n"
-        
-        # Trust indicators
-        report += "\nTrust Indicators:\n"
-        if account_age > 365:
-            report += "- Account > 1 year old\n"
-        elif account_age > 180:
-            report += "- Account 6-12 months old\n"
-        else:
-            report += "- Account < 6 months old\n"
-        
-        # Bio analysis
-        if user_data.description:
-            report += f"\nBio Analysis:\n"
-            report += f"- Length: {len(user_data.description)} characters\n"
-            if 'http' in user_data.description.lower():
-                report += "- Contains links\n"
-            if any(ord(c) > 127 for c in user_data.description):
-                report += "- Contains special characters\n"
-        
-        return report
-
 # Predefined list of trusted accounts
 TRUSTED_ACCOUNTS = [
     # Major Solana DeFi Protocols
@@ -1,29 +1,89 @@
 # tweet_monitor.py
 import tweepy
 from typing import List, Dict, Any, Optional
-import time
 from datetime import datetime, timedelta
 import random
+import re
+import threading
+from collections import OrderedDict
+from rate_limits import reset_seconds
+
+PROCESSED_ENTRY_BYTES = 88  # Ordered dict slot, link node and int id
+MAX_QUERY_LENGTH = 512  # Recent search query length limit
 
 class TweetMonitor:
-    def __init__(self, client: tweepy.Client):
+    def __init__(self, client: tweepy.Client, stop_event: Optional[threading.Event] = None,
+                 handles: Optional[List[str]] = None, phrases: Optional[List[str]] = None):
         self.client = client
-        self.trigger_phrase = "riddle me this"
-        self.target_account = "projectrugguard"
+        self.stop_event = stop_event or threading.Event()  # Set to cut waits short on shutdown
+        self.target_accounts = [h.strip().lstrip("@") for h in (handles or ["projectrugguard"]) if h.strip()]
+        self.trigger_phrases = [" ".join(p.replace('"', "").lower().split()) for p in (phrases or ["riddle me this"]) if p.strip()]
+        if not self.target_accounts:
+            raise ValueError("No target handles configured; set TARGET_HANDLES to a comma-separated list")
+        if not self.trigger_phrases:
+            raise ValueError("No trigger phrases configured; set TRIGGER_PHRASES to a comma-separated list")
         self.last_check_time = datetime.now()
-        self.processed_tweets = set()  # Keep track of processed tweets
+        self.processed_tweets = OrderedDict()  # Processed trigger reply ids, oldest first
+        self.since_ids = {}  # Newest reply id seen per search query
+        self.pending_pages = {}  # Query -> next_token and newest_id of a poll that ran out of pages
         self.rate_limit_reset = None
         self.backoff_time = 60  # Start with 1 minute backoff
         self.max_backoff = 900  # Maximum 15 minutes backoff
         self.min_results = 10  # Twitter API minimum requirement
+        self.max_results = 100  # Replies per search page
+        self.max_pages = 5  # Pages per query per poll
         self.last_api_call = datetime.now()
         self.min_api_interval = 2  # Minimum seconds between API calls
 
+        # Compiled once: the search queries and one-pass matchers for every handle and phrase
+        self.queries = self._build_queries()
+        self._handles_by_lower = {h.lower(): h for h in self.target_accounts}
+        self._handle_pattern = re.compile(
+            r"@(" + "|".join(re.escape(h) for h in self.target_accounts) + r")\b", re.IGNORECASE
+        )
+        # Longest phrases first so overlapping variants match the most specific one
+        self._phrase_pattern = re.compile(
+            "|".join(r"\s+".join(re.escape(w) for w in p.split())
+                     for p in sorted(self.trigger_phrases, key=len, reverse=True)),
+            re.IGNORECASE
+        )
+
+    def _sleep(self, seconds: float) -> None:
+        """Sleep, returning early if shutdown has been requested"""
+        self.stop_event.wait(max(0, seconds))
+
+    def get_state(self) -> Dict[str, Any]:
+        """
+        Return the cursor and rate-limit state as JSON-serializable data for checkpoints
+        """
+        return {
+            "since_ids": dict(self.since_ids),
+            "pending_pages": dict(self.pending_pages),
+            "processed_tweets": list(self.processed_tweets),
+            "rate_limit_reset": self.rate_limit_reset.isoformat() if self.rate_limit_reset else None,
+            "backoff_time": self.backoff_time,
+            "last_api_call": self.last_api_call.isoformat()
+        }
+
+    def load_state(self, state: Dict[str, Any]) -> None:
+        """
+        Restore state saved by get_state so polling resumes where it stopped
+        """
+        self.since_ids = dict(state.get("since_ids", {}))
+        self.pending_pages = dict(state.get("pending_pages", {}))
+        self.processed_tweets = OrderedDict((tweet_id, None) for tweet_id in state.get("processed_tweets", []))
+        if state.get("rate_limit_reset"):
+            self.rate_limit_reset = datetime.fromisoformat(state["rate_limit_reset"])
+        self.backoff_time = state.get("backoff_time", self.backoff_time)
+        if state.get("last_api_call"):
+            self.last_api_call = datetime.fromisoformat(state["last_api_call"])
+
     def _handle_rate_limit(self, e: tweepy.errors.TooManyRequests) -> None:
         """Handle rate limit with exponential backoff"""
-        if hasattr(e, 'reset_time'):
-            self.rate_limit_reset = datetime.now() + timedelta(seconds=e.reset_time)
-            wait_time = e.reset_time
+        reset_in = reset_seconds(e, default=None)
+        if reset_in is not None:
+            self.rate_limit_reset = datetime.now() + timedelta(seconds=reset_in)
+            wait_time = int(reset_in)
         else:
             # If no reset time provided, use exponential backoff
             wait_time = min(self.backoff_time * 2, self.max_backoff)
@@ -31,7 +91,7 @@ class TweetMonitor:
             self.rate_limit_reset = datetime.now() + timedelta(seconds=wait_time)
         
         print(f"Rate limit hit. Waiting {wait_time} seconds before next check...")
-        time.sleep(wait_time)
+        self._sleep(wait_time)
         self.backoff_time = max(60, self.backoff_time // 2)  # Reset backoff after successful wait
         self.last_api_call = datetime.now()  # Reset last API call time
 
@@ -42,126 +102,164 @@ class TweetMonitor:
             wait_seconds = (self.rate_limit_reset - datetime.now()).total_seconds()
             if wait_seconds > 0:
                 print(f"Rate limit: Waiting {int(wait_seconds)} seconds before next check...")
-                time.sleep(min(wait_seconds, 60))  # Sleep in chunks of max 60 seconds
+                self._sleep(min(wait_seconds, 60))  # Sleep in chunks of max 60 seconds
                 return True
 
         # Check minimum interval between API calls
         time_since_last_call = (datetime.now() - self.last_api_call).total_seconds()
         if time_since_last_call < self.min_api_interval:
             sleep_time = self.min_api_interval - time_since_last_call
-            time.sleep(sleep_time)
+            self._sleep(sleep_time)
             return True
 
         return False
 
+    def memory_size(self) -> int:
+        """Estimated bytes held by the processed tweet ids"""
+        return len(self.processed_tweets) * PROCESSED_ENTRY_BYTES
+
+    def evict_processed(self, nbytes: int) -> int:
+        """Forget the oldest processed tweet ids until roughly nbytes are freed"""
+        freed = 0
+        while self.processed_tweets and freed < nbytes:
+            self.processed_tweets.popitem(last=False)
+            freed += PROCESSED_ENTRY_BYTES
+        # Dicts never shrink on deletion, so rebuild to hand the table back
+        self.processed_tweets = OrderedDict(self.processed_tweets)
+        return freed
+
+    def _pack(self, terms: List[str], budget: int) -> List[str]:
+        """Greedily join terms with OR into as few groups as fit within budget characters"""
+        groups, current = [], []
+        for term in terms:
+            if current and len(" OR ".join(current + [term])) > budget:
+                groups.append(" OR ".join(current))
+                current = []
+            current.append(term)
+        if current:
+            groups.append(" OR ".join(current))
+        return groups
+
+    def _build_queries(self) -> List[str]:
+        """
+        Combine every handle and phrase into the fewest search queries under the length limit
+        Usually this is a single query: (@a OR @b) ("phrase one" OR "phrase two") is:reply -is:retweet
+        """
+        suffix = " is:reply -is:retweet"
+        # A phrase containing another phrase is already covered by the shorter one
+        phrases = [
+            f'"{phrase}"' for phrase in dict.fromkeys(self.trigger_phrases)
+            if not any(other != phrase and f" {other} " in f" {phrase} " for other in self.trigger_phrases)
+        ]
+        mentions = list({f"@{handle.lower()}": f"@{handle}" for handle in self.target_accounts}.values())
+
+        phrase_groups = self._pack(phrases, MAX_QUERY_LENGTH // 2)
+        longest = max(len(group) for group in phrase_groups)
+        handle_groups = self._pack(mentions, MAX_QUERY_LENGTH - longest - len(suffix) - 5)
+        return [f"({h}) ({p}){suffix}" for h in handle_groups for p in phrase_groups]
+
+    def match(self, text: str) -> Optional[Dict[str, str]]:
+        """
+        Match a reply against every handle and phrase in one pass
+        Returns the matched handle and phrase, or None if either is missing
+        """
+        phrase = self._phrase_pattern.search(text)
+        if not phrase:
+            return None
+        handle = self._handle_pattern.search(text)
+        if not handle:
+            return None
+        return {
+            "handle": self._handles_by_lower[handle.group(1).lower()],
+            "phrase": " ".join(phrase.group(0).lower().split())
+        }
+
     def listen_for_trigger(self) -> List[Dict[str, Any]]:
         """
-        Monitor tweets for trigger phrase with improved rate limit handling
+        Search every configured handle/phrase combination for new trigger replies
         """
         if self._should_wait():
             return []
 
-        try:
-            # Get @projectrugguard's user ID
-            user = self.client.get_user(username="projectrugguard")
-            self.last_api_call = datetime.now()
-            
-            if not user.data:
-                print("Could not find @projectrugguard user")
-                return []
-            
-            user_id = user.data.id
-            
-            # Get recent tweets from @projectrugguard
-            tweets = self.client.get_users_tweets(
-                user_id,
-                max_results=self.min_results,
-                tweet_fields=["conversation_id", "created_at"],
-                exclude=["retweets", "replies"]
-            )
-            self.last_api_call = datetime.now()
-            
-            if not tweets.data:
-                return []
-            
-            triggered_tweets = []
-            
-            for tweet in tweets.data:
-                if tweet.id in self.processed_tweets:
-                    continue
-                
-                try:
-                    # Get replies to this tweet
-                    replies = self.client.search_recent_tweets(
-                        query=f"conversation_id:{tweet.conversation_id}",
-                        tweet_fields=["referenced_tweets", "author_id", "conversation_id"],
-                        max_results=self.min_results
-                    )
-                    self.last_api_call = datetime.now()
-                    
-                    if replies.data:
-                        for reply in replies.data:
-                            if "riddle me this" in reply.text.lower():
-                                triggered_tweets.append({
-                                    "tweet_id": tweet.id,
-                                    "author_id": tweet.author_id,
-                                    "conversation_id": tweet.conversation_id,
-                                    "trigger_reply": reply
-                                })
-                                self.processed_tweets.add(tweet.id)
-                    
-                    # Clean up old processed tweets
-                    if len(self.processed_tweets) > 100:
-                        self.processed_tweets = set(list(self.processed_tweets)[-100:])
-                    
-                    # Add small random delay between API calls
-                    time.sleep(random.uniform(2, 5))  # Increased delay to be more conservative
-                    
-                except tweepy.errors.TooManyRequests as e:
-                    self._handle_rate_limit(e)
-                    break
-                except Exception as e:
-                    print(f"Error processing tweet {tweet.id}: {e}")
-                    continue
-            
-            return triggered_tweets
-            
-        except tweepy.errors.TooManyRequests as e:
-            self._handle_rate_limit(e)
-            return []
-        except Exception as e:
-            print(f"Error in listen_for_trigger: {e}")
-            return []
+        triggered_tweets = []
+        for query in self.queries:
+            if self.stop_event.is_set():
+                break
 
-    def get_original_author_id(self, tweet: tweepy.Tweet) -> Optional[str]:
-        """
-        Get the ID of the original tweet's author
-        Returns None if the original tweet cannot be found
-        """
-        try:
-            # Get the original tweet being replied to
-            if not hasattr(tweet, 'referenced_tweets') or not tweet.referenced_tweets:
-                return None
-                
-            reply_tweet = next(
-                (ref for ref in tweet.referenced_tweets if ref.type == 'replied_to'),
-                None
-            )
-            
-            if not reply_tweet:
-                return None
-                
             try:
-                original_tweet = self.client.get_tweet(
-                    reply_tweet.id,
-                    user_fields=["id"]
-                )
-                return original_tweet.data.author_id if original_tweet.data else None
+                # Resume a backlog left by the previous poll before moving the cursor on
+                pending = self.pending_pages.get(query, {})
+                next_token = pending.get("next_token")
+                newest_id = pending.get("newest_id")
+                try:
+                    for _ in range(self.max_pages):
+                        try:
+                            # Only replies newer than the cursor; since_id stays fixed across pages
+                            page = self.client.search_recent_tweets(
+                                query=query,
+                                tweet_fields=["referenced_tweets", "author_id", "conversation_id"],
+                                max_results=self.max_results,
+                                since_id=self.since_ids.get(query),
+                                next_token=next_token
+                            )
+                        except tweepy.errors.BadRequest:
+                            if next_token is None:
+                                raise
+                            # Stale token: rescan from the cursor; processed ids filter repeats
+                            print(f"Discarding expired page token for query {query}")
+                            self.pending_pages.pop(query, None)
+                            next_token = newest_id = None
+                            continue
+
+                        self.last_api_call = datetime.now()
+                        meta = page.meta or {}
+                        if newest_id is None and meta.get("newest_id"):
+                            newest_id = meta["newest_id"]
+
+                        for reply in page.data or []:
+                            if reply.id in self.processed_tweets:
+                                continue
+                            matched = self.match(reply.text)
+                            if matched:
+                                triggered_tweets.append(self._trigger_from_reply(reply, matched))
+                                self.processed_tweets[reply.id] = None
+
+                        next_token = meta.get("next_token")
+                        if not next_token:
+                            break
+                finally:
+                    # Advance the cursor only once every page down to it has been read;
+                    # otherwise remember where to pick up, even if a page call failed
+                    if next_token:
+                        self.pending_pages[query] = {"next_token": next_token, "newest_id": newest_id}
+                    else:
+                        self.pending_pages.pop(query, None)
+                        if newest_id is not None:
+                            self.since_ids[query] = newest_id
+
+                # Add small random delay between API calls
+                self._sleep(random.uniform(2, 5))  # Increased delay to be more conservative
+
             except tweepy.errors.TooManyRequests as e:
-                print(f"Rate limit exceeded. Waiting for {e.reset_time} seconds...")
-                time.sleep(e.reset_time)
-                return None
-            
-        except Exception as e:
-            print(f"Error getting original author: {e}")
-            return None
+                self._handle_rate_limit(e)
+                break
+            except Exception as e:
+                print(f"Error in listen_for_trigger for query {query}: {e}")
+                continue
+
+        return triggered_tweets
+
+    def _trigger_from_reply(self, reply: tweepy.Tweet, matched: Dict[str, str]) -> Dict[str, Any]:
+        """Plain, serializable description of a trigger so it can be checkpointed"""
+        replied_to = next(
+            (ref for ref in (reply.referenced_tweets or []) if ref.type == 'replied_to'),
+            None
+        )
+        return {
+            "reply_id": reply.id,
+            "replied_to_id": replied_to.id if replied_to else None,
+            "conversation_id": reply.conversation_id,
+            "author_id": reply.author_id,
+            "handle": matched["handle"],
+            "phrase": matched["phrase"]
+        }